@@ -1,15 +1,50 @@
+from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from app.core.principal import Principal, principal_cache
 from app.core.security import SECRET_KEY, ALGORITHM
 from app.models.user import User as UserModel
-from app.db.session import get_db
+from app.db.session import async_session
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token", auto_error=False)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+async def load_principal(login_id: str):
+    stmt = select(UserModel.student_id, UserModel.login_id, UserModel.is_active).where(
+        UserModel.login_id == login_id
+    )
+    async with async_session() as session:
+        row = (await session.execute(stmt)).first()
+    return Principal(*row) if row else None
+
+
+async def active_principal(login_id: str):
+    """The token subject's account if it exists and is active; steady state is a cache hit, no session opened"""
+    principal = principal_cache.get(login_id)
+    if principal is None:
+        principal = await load_principal(login_id)
+        if principal is None:
+            return None
+        principal_cache.set(login_id, principal)
+    return principal if principal.is_active else None
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    subject: str
+    student_id: str
+    role: str
+    scopes: frozenset
+
+
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> TokenClaims:
+    """
+    Verified token claims. Scopes come from the token alone; the account is
+    confirmed active through the principal cache, so a deactivated user loses
+    access within PRINCIPAL_CACHE_TTL_SECONDS (immediately on this worker).
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -17,15 +52,48 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     )
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except JWTError:
         raise credentials_exception
+    if payload.get("sub") is None:
+        raise credentials_exception
+    if await active_principal(payload["sub"]) is None:
+        raise credentials_exception
+    return TokenClaims(
+        subject=payload["sub"],
+        student_id=payload.get("student_id"),
+        role=payload.get("role"),
+        scopes=frozenset((payload.get("scope") or "").split()),
+    )
 
-    result = await db.execute(select(UserModel).where(UserModel.username == username))
-    user = result.scalars().first()
 
-    if user is None:
-        raise credentials_exception
-    return user
+async def get_current_user(claims: TokenClaims = Depends(get_token_claims)) -> Principal:
+    principal = await active_principal(claims.subject)
+    if principal is None:
+        # Deactivated between the two lookups
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    return principal
+
+
+async def authorize_student(student_id: str, claims: TokenClaims = Depends(get_token_claims)) -> TokenClaims:
+    """{student_id} routes: the student themself, or a token with students:read"""
+    if claims.student_id == student_id or "students:read" in claims.scopes:
+        return claims
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to access this student")
+
+
+def require_scope(scope: str):
+    async def check_scope(claims: TokenClaims = Depends(get_token_claims)) -> TokenClaims:
+        if scope not in claims.scopes:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"Requires scope {scope}")
+        return claims
+    return check_scope
+
+
+async def get_optional_claims(token: str = Depends(optional_oauth2_scheme)):
+    """Claims when a valid bearer token is present, else None (for attributing unauthenticated routes)"""
+    if not token:
+        return None
+    try:
+        return await get_token_claims(token)
+    except HTTPException:
+        return None
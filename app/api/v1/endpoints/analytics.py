@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.api.v1.dependencies import require_scope
+from app.db.session import get_db
+from app.schemas.analytics import GradeDistributionSchema, RefreshResponse
+from app.services.AnalyticsService import AnalyticsService
+
+router = APIRouter()
+
+
+@router.get("/modules/{offered_module_id}", response_model=List[GradeDistributionSchema], dependencies=[Depends(require_scope("students:read"))])
+async def read_module_distribution(
+    offered_module_id: int,
+    exam_year: Optional[int] = None,
+    exam_term: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Letter-grade histogram, mean grade point and pass/fail rates of an offered module,
+    served from the precomputed aggregate table
+    """
+    service = AnalyticsService(db)
+    return await service.get_module_distributions(offered_module_id, exam_year, exam_term)
+
+
+@router.get("/faculty/{faculty_id}", response_model=List[GradeDistributionSchema], dependencies=[Depends(require_scope("students:read"))])
+async def read_faculty_distributions(
+    faculty_id: int,
+    exam_year: Optional[int] = None,
+    exam_term: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Grade distributions of every module taught by a faculty member
+    """
+    service = AnalyticsService(db)
+    return await service.get_faculty_distributions(faculty_id, exam_year, exam_term)
+
+
+@router.post("/refresh", response_model=RefreshResponse, dependencies=[Depends(require_scope("admin"))])
+async def refresh_distributions(db: AsyncSession = Depends(get_db)):
+    """
+    Pull result rows newer than the watermark into the aggregate table now
+    """
+    service = AnalyticsService(db)
+    return {"groups_refreshed": await service.refresh_aggregates()}
@@ -3,21 +3,36 @@ from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.core.security import create_access_token, verify_password
+from app.core.security import access_token_claims, create_access_token, login_role
+from app.core.password_hasher import password_hasher
+from app.core.principal import invalidate_principal
 from app.core.security import generate_reset_token
+from app.api.v1.dependencies import TokenClaims, get_optional_claims
 #from app.utils.email_utils import send_password_reset_email
 from app.schemas.auth import Token, UserCreate, UserResponse, UserUpdate, RoleAssignRequest, ResetPasswordRequest, StandardResponse, ResetEmailRequest
 from app.models.user import User as UserModel
 from app.db.session import get_db
-from app.core.security import get_password_hash
 import bcrypt
 from typing import List
 from fastapi.responses import HTMLResponse, JSONResponse
 from app.services.PasswordResetService import PasswordResetService
+from app.services.LoginEventService import record_login
+from app.services.AuditService import record_change
 
 router = APIRouter()
 
 
+async def audit_change(http_request: Request, claims: TokenClaims, action: str, student_id: str, detail: str = None):
+    """Account changes are audited after commit; the actor is the caller's token subject when one was sent"""
+    await record_change(
+        claims.subject if claims else None,
+        action,
+        student_id,
+        detail,
+        ip=http_request.client.host if http_request.client else None,
+    )
+
+
 # --------------------
 # Helper: Password hashing
 # --------------------
@@ -32,6 +47,7 @@ router = APIRouter()
 # --------------------
 @router.post("/login", response_model=Token)
 async def login_for_access_token(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ): 
@@ -40,14 +56,24 @@ async def login_for_access_token(
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(form_data.password, user.hash_password):
+    success = user is not None and await password_hasher.verify(form_data.password, user.hash_password)
+    # Queued for the background writer; the response never waits on it
+    record_login(
+        student_id=form_data.username,
+        login_id=user.login_id if user else None,
+        ip=request.client.host if request.client else None,
+        user_agent=request.headers.get("user-agent"),
+        success=success,
+    )
+
+    if not success:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect login ID or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = create_access_token(data={"sub": user.login_id})
+    access_token = create_access_token(data=access_token_claims(user.login_id, user.student_id, login_role(user.student_id)))
     return {"access_token": access_token, "token_type": "bearer", "student_id": user.student_id, "email": user.login_id}
 
 
@@ -56,7 +82,7 @@ async def login_for_access_token(
 # --------------------
 @router.post("/create-user", response_model=UserResponse)
 async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     db_user = UserModel(
         person_id=user.student_id,
         login_id=user.login_id,
@@ -71,7 +97,7 @@ async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
 
 @router.post("/register", response_model=UserResponse)
 async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     db_user = UserModel(
         person_id=user.student_id,
         login_id=user.login_id,
@@ -85,22 +111,30 @@ async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
 
 
 @router.put("/update-user/{student_id}", response_model=UserResponse)
-async def update_user(student_id: str, user_update: UserUpdate, db: AsyncSession = Depends(get_db)):
+async def update_user(student_id: str, user_update: UserUpdate, http_request: Request, db: AsyncSession = Depends(get_db), claims: TokenClaims = Depends(get_optional_claims)):
     result = await db.execute(select(UserModel).where(UserModel.student_id == student_id))
     db_user = result.scalar_one_or_none()
 
     if not db_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
+    previous_login_id = db_user.login_id
     if user_update.login_id:
         db_user.login_id = user_update.login_id
     if user_update.password:
-        db_user.hash_password = get_password_hash(user_update.password)   
+        db_user.hash_password = await password_hasher.hash(user_update.password)   
     if user_update.is_active is not None:
-        db_user.usr_active = user_update.is_active
+        db_user.is_active = user_update.is_active
 
     db.add(db_user)
     await db.commit()
+    invalidate_principal(previous_login_id, db_user.login_id)
+    changed = [name for name, value in (
+        ("login_id", user_update.login_id),
+        ("password", user_update.password),
+        ("is_active", user_update.is_active),
+    ) if value is not None and value != ""]
+    await audit_change(http_request, claims, "user.update", student_id, ",".join(changed) or None)
     await db.refresh(db_user)
     return db_user
 
@@ -114,7 +148,7 @@ async def read_users(skip: int = 0, limit: int = 100, db: AsyncSession = Depends
 
 
 @router.post("/assign-role/{student_id}", response_model=UserResponse)
-async def assign_role(student_id: str, request: RoleAssignRequest, db: AsyncSession = Depends(get_db)):
+async def assign_role(student_id: str, request: RoleAssignRequest, http_request: Request, db: AsyncSession = Depends(get_db), claims: TokenClaims = Depends(get_optional_claims)):
     result = await db.execute(select(UserModel).where(UserModel.student_id == student_id))
     user = result.scalar_one_or_none()
 
@@ -124,12 +158,14 @@ async def assign_role(student_id: str, request: RoleAssignRequest, db: AsyncSess
     user.usr_role = request.role
     db.add(user)
     await db.commit()
+    invalidate_principal(user.login_id)
+    await audit_change(http_request, claims, "user.assign_role", student_id, f"role={request.role}")
     await db.refresh(user)
     return user
 
 
 @router.post("/change-password/{student_id}", response_model=UserResponse)
-async def change_password(student_id: str, request: ResetPasswordRequest, db: AsyncSession = Depends(get_db)):
+async def change_password(student_id: str, request: ResetPasswordRequest, http_request: Request, db: AsyncSession = Depends(get_db), claims: TokenClaims = Depends(get_optional_claims)):
     print("Hello World")
     print(student_id)
     result = await db.execute(select(UserModel).where(UserModel.student_id == student_id))
@@ -138,15 +174,17 @@ async def change_password(student_id: str, request: ResetPasswordRequest, db: As
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user.hash_password = get_password_hash(request.new_password)
+    user.hash_password = await password_hasher.hash(request.new_password)
     db.add(user)
     await db.commit()
+    invalidate_principal(user.login_id)
+    await audit_change(http_request, claims, "user.change_password", student_id)
     await db.refresh(user)
     return user
 
 
 @router.post("/change-email/{student_id}", response_model=UserResponse)
-async def change_password(student_id: str, request: ResetEmailRequest, db: AsyncSession = Depends(get_db)):  
+async def change_password(student_id: str, request: ResetEmailRequest, http_request: Request, db: AsyncSession = Depends(get_db), claims: TokenClaims = Depends(get_optional_claims)):  
    
     result = await db.execute(select(UserModel).where(UserModel.student_id == student_id))
     user = result.scalar_one_or_none()
@@ -154,24 +192,29 @@ async def change_password(student_id: str, request: ResetEmailRequest, db: Async
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    previous_login_id = user.login_id
     user.login_id = request.email
     db.add(user)
     await db.commit()
+    invalidate_principal(previous_login_id, user.login_id)
+    await audit_change(http_request, claims, "user.change_email", student_id)
     await db.refresh(user)
     return user
 
 
 @router.post("/generate-password/{student_id}", response_model=UserResponse)
-async def generate_password(student_id: str, request: ResetPasswordRequest, db: AsyncSession = Depends(get_db)):
+async def generate_password(student_id: str, request: ResetPasswordRequest, http_request: Request, db: AsyncSession = Depends(get_db), claims: TokenClaims = Depends(get_optional_claims)):
     result = await db.execute(select(UserModel).where(UserModel.student_id == student_id))
     user = result.scalar_one_or_none()
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user.hash_password = get_password_hash(request.new_password)
+    user.hash_password = await password_hasher.hash(request.new_password)
     db.add(user)
     await db.commit()
+    invalidate_principal(user.login_id)
+    await audit_change(http_request, claims, "user.generate_password", student_id)
     await db.refresh(user)
     return user
 
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from typing import List
+from typing import List, Literal, Optional
 
+from app.api.v1.dependencies import authorize_student, require_scope
+from app.core.etag import etag_headers, etag_matches, make_etag, not_modified
+from app.core.fields import FIELDS_DESCRIPTION, parse_fields
+from app.core.responses import FastJSONResponse
 from app.db.session import get_db
-from app.models.course_enrollment import CourseEnrollment
-from app.schemas.course_enrollment import CourseEnrollmentSchema
+from app.schemas.course_enrollment import CourseEnrollmentSchema, RosterPageSchema, TermCreditSummarySchema
+from app.services.CourseEnrollmentService import ENROLLMENT_FIELDS, CourseEnrollmentService, enrollment_response, export_roster_csv
 
 router = APIRouter()
 
@@ -22,27 +26,78 @@ async def read_course_enrollments(
     return enrollments """
 
 
-@router.get("/{student_id}", response_model=List[CourseEnrollmentSchema])
+@router.get("/roster", response_model=RosterPageSchema, response_class=FastJSONResponse, dependencies=[Depends(require_scope("students:read"))])
+async def read_roster(
+    module_code: str,
+    tra_year: int,
+    tra_term: int,
+    batch_name: Optional[int] = None,
+    section_name: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    output: Literal["json", "csv"] = Query("json", alias="format"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Everyone registered in a module (optionally one batch/section) for a term.
+    JSON pages follow `next_cursor`; format=csv streams the whole roster.
+    """
+    if output == "csv":
+        filename = f"roster-{module_code}-{tra_year}-{tra_term}.csv"
+        return StreamingResponse(
+            export_roster_csv(module_code, tra_year, tra_term, batch_name, section_name),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    service = CourseEnrollmentService(db)
+    page = await service.roster_page(module_code, tra_year, tra_term, batch_name, section_name, cursor, limit)
+    return FastJSONResponse(page)
+
+
+@router.get("/{student_id}", response_model=List[CourseEnrollmentSchema], response_class=FastJSONResponse, dependencies=[Depends(authorize_student)])
 async def read_course_enrollment_by_student(
     student_id: str,
+    request: Request,
+    tra_year: Optional[int] = None,
+    tra_term: Optional[int] = None,
+    reg_status: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Get all course enrollments for a specific student
+    Get course enrollments for a specific student, optionally for one year/term/status
     """
-    #stmt = select(CourseEnrollment).where(CourseEnrollment.student_id == student_id)
-    stmt = (
-        select(CourseEnrollment)
-        .where(CourseEnrollment.student_id == student_id)
-        .order_by(
-            CourseEnrollment.tra_year.asc(),
-            CourseEnrollment.tra_term.asc(),
-        )
-    )
-    result = await db.execute(stmt)
-    enrollments = result.scalars().all()
+    selected = parse_fields(fields, ENROLLMENT_FIELDS)
+    service = CourseEnrollmentService(db)
+    enrollments = await service.fetch_by_student(student_id, tra_year, tra_term, reg_status, selected)
 
     if not enrollments:
         raise HTTPException(status_code=404, detail="No course enrollments found")
 
-    return enrollments
+    # Validator from the raw row tuples, checked before anything is serialized
+    etag = make_etag("course", student_id, selected, enrollments)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return FastJSONResponse([enrollment_response(row) for row in enrollments], headers=etag_headers(etag))
+
+
+@router.get("/{student_id}/summary", response_model=List[TermCreditSummarySchema], dependencies=[Depends(authorize_student)])
+async def read_course_credit_summary(
+    student_id: str,
+    tra_year: Optional[int] = None,
+    tra_term: Optional[int] = None,
+    reg_status: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Per-term totals of credit hours, modules and labs
+    """
+    service = CourseEnrollmentService(db)
+    summary = await service.credit_summary(student_id, tra_year, tra_term, reg_status)
+
+    if not summary:
+        raise HTTPException(status_code=404, detail="No course enrollments found")
+
+    return summary
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+
+from app.api.v1.dependencies import authorize_student
+from app.core.responses import FastJSONResponse
+from app.schemas.dashboard import DashboardSchema
+from app.services.DashboardService import DashboardService
+
+router = APIRouter()
+
+
+@router.get("/{student_id}", response_model=DashboardSchema, response_class=FastJSONResponse, dependencies=[Depends(authorize_student)])
+async def read_dashboard(student_id: str):
+    """
+    Student record, course enrollments and results in one round trip,
+    with per-part timings
+    """
+    service = DashboardService()
+    payload = await service.load(student_id)
+    return FastJSONResponse(payload)
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.api.v1.dependencies import authorize_student, require_scope
+from app.db.session import get_db
+from app.schemas.degree_audit import DegreeAuditSchema
+from app.services.DegreeAuditService import DegreeAuditService
+
+router = APIRouter()
+
+
+@router.get("/batch/{batch_name}", response_model=List[DegreeAuditSchema], dependencies=[Depends(require_scope("students:read"))])
+async def audit_batch(
+    batch_name: int,
+    section_name: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Degree audit of every student in a batch (graduation clearance)
+    """
+    service = DegreeAuditService(db)
+    return await service.audit_batch(batch_name, section_name)
+
+
+@router.get("/{student_id}", response_model=DegreeAuditSchema, dependencies=[Depends(authorize_student)])
+async def audit_student(student_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Credits earned and remaining per mod_group / mod_type bucket
+    """
+    service = DegreeAuditService(db)
+    return await service.audit_student(student_id)
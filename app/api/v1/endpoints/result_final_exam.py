@@ -1,13 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List
+from typing import Dict, List, Literal, Optional
 from sqlalchemy.exc import SQLAlchemyError
+from app.api.v1.dependencies import TokenClaims, authorize_student, require_scope
 from app.db.session import get_db
 from decimal import Decimal
 from app.models.result_final_exam import ResultFinalExam
-from app.schemas.result_final_exam import ResultFinalExamSchema, FormatedResultSchema
-from app.services.ResultService import ResultService
+from app.schemas.result_final_exam import ResultFinalExamSchema, FormatedResultSchema, ResultSummarySchema, ResultBatchRequest, SnapshotStatusSchema, SnapshotRefreshResponse
+from app.services.AuditService import record_access
+from app.services.ResultService import RESULT_FIELDS, ResultService, export_results
+from app.services.TranscriptService import TranscriptService
+from app.services.TabulationService import TabulationService
+from app.services.ResultSnapshotService import ResultSnapshotService
+from fastapi.responses import StreamingResponse
+from app.core.responses import FastJSONResponse
+from app.core.etag import etag_headers, etag_matches, not_modified
+from app.core.fields import FIELDS_DESCRIPTION, parse_fields
+from app.core.file_delivery import file_response
 #router = APIRouter(prefix="/results", tags=["Exam Results"])
 router = APIRouter()
 
@@ -23,12 +33,173 @@ async def read_results(skip: int = 0, limit: int = 100, db: AsyncSession = Depen
 
     return results"""
 
-@router.get("/{student_id}", response_model=List[FormatedResultSchema])
+@router.get("/cohort/transcripts.zip")
+async def get_cohort_transcripts(
+    batch_name: int,
+    request: Request,
+    section_name: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    claims: TokenClaims = Depends(require_scope("students:read")),
+):
+    """
+    Transcripts for a whole batch (optionally one section) streamed as a ZIP
+    """
+    service = TranscriptService(db)
+    payloads = await service.fetch_cohort(batch_name, section_name)
+    record_access(
+        claims.subject,
+        "transcript.bulk_download",
+        detail=f"batch={batch_name} section={section_name or '*'} students={len(payloads)}",
+        ip=request.client.host if request.client else None,
+    )
+
+    filename = f"transcripts-{batch_name}{'-' + section_name if section_name else ''}.zip"
+    return StreamingResponse(
+        service.stream_cohort_zip(payloads),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/export", dependencies=[Depends(require_scope("students:read"))])
+async def export_term_results(
+    exam_year: int,
+    exam_term: Optional[int] = None,
+    programme_code: Optional[str] = None,
+    output: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+):
+    """
+    Stream a whole term's results (e.g. for UGC / accreditation) as NDJSON or CSV
+    """
+    stream = export_results(exam_year, exam_term, programme_code, output)
+    suffix = f"{exam_year}{'-' + str(exam_term) if exam_term else ''}{'-' + programme_code if programme_code else ''}"
+    if output == "csv":
+        return StreamingResponse(
+            stream,
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="results-{suffix}.csv"'},
+        )
+    return StreamingResponse(
+        stream,
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="results-{suffix}.ndjson"'},
+    )
+
+
+@router.get("/tabulation", dependencies=[Depends(require_scope("students:read"))])
+async def get_tabulation_sheet(
+    batch_name: int,
+    section_name: str,
+    exam_year: int,
+    exam_term: int,
+    output: Literal["json", "csv"] = Query("json", alias="format"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Section tabulation sheet: one row per student, one column per module,
+    with term GPA per student and average grade point per module
+    """
+    service = TabulationService(db)
+    sheet = await service.build_sheet(batch_name, section_name, exam_year, exam_term)
+
+    if output == "csv":
+        filename = f"tabulation-{batch_name}-{section_name}-{exam_year}-{exam_term}.csv"
+        return StreamingResponse(
+            service.iter_csv(sheet),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+    return StreamingResponse(service.iter_json(sheet), media_type="application/json")
+
+
+@router.get("/snapshot/status", response_model=SnapshotStatusSchema, dependencies=[Depends(require_scope("admin"))])
+async def get_snapshot_status(db: AsyncSession = Depends(get_db)):
+    """
+    Read source, watermark and lag of the local result snapshot
+    """
+    service = ResultSnapshotService(db)
+    return await service.status()
+
+
+@router.post("/snapshot/refresh", response_model=SnapshotRefreshResponse, dependencies=[Depends(require_scope("admin"))])
+async def refresh_snapshot(db: AsyncSession = Depends(get_db)):
+    """
+    Pull result rows newer than the watermark into the snapshot now
+    """
+    service = ResultSnapshotService(db)
+    return {"rows_refreshed": await service.refresh()}
+
+
+@router.post("/batch", response_model=Dict[str, List[FormatedResultSchema]], response_class=FastJSONResponse, dependencies=[Depends(require_scope("students:read"))])
+async def get_results_batch(
+    request: ResultBatchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Results for a list of students (e.g. an advisor's advisees) in one round trip
+    """
+    service = ResultService(db)
+    results = await service.generate_results_batch(request.student_ids)
+
+    return FastJSONResponse(results)
+
+
+@router.get("/{student_id}", response_model=List[FormatedResultSchema], response_class=FastJSONResponse, dependencies=[Depends(authorize_student)])
 async def get_results_by_student(
+    student_id: str,
+    request: Request,
+    mode: Literal["all", "effective", "annotated"] = "all",
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    mode=all: every attempt as stored; mode=effective: only the winning attempt
+    per module; mode=annotated: every attempt with a `superseded` flag.
+    fields=module_code,letter_grade,... selects and returns only those keys.
+    """
+    selected = parse_fields(fields, RESULT_FIELDS)
+    service = ResultService(db)
+    etag = await service.result_etag(student_id, mode, selected)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    if mode == "all":
+        results = await service.generate_result(student_id, selected)
+    else:
+        results = await service.generate_effective_result(
+            student_id, include_superseded=(mode == "annotated"), fields=selected
+        )
+
+    # Rows are already shaped by the precompiled mapper; skip re-validation
+    return FastJSONResponse(results, headers=etag_headers(etag))
+
+
+@router.get("/{student_id}/summary", response_model=ResultSummarySchema, dependencies=[Depends(authorize_student)])
+async def get_result_summary(
     student_id: str,
     db: AsyncSession = Depends(get_db)
 ):
-    service = ResultService(db)    
-    results = await service.generate_result(student_id)
+    """
+    Per-term SGPA and cumulative CGPA computed server-side
+    """
+    service = ResultService(db)
+    summary = await service.generate_summary(student_id)
+
+    return summary
+
+
+@router.get("/{student_id}/transcript.pdf")
+async def get_transcript_pdf(
+    student_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    claims: TokenClaims = Depends(authorize_student),
+):
+    """
+    Transcript PDF, rendered in the process pool and cached per result fingerprint
+    """
+    service = TranscriptService(db)
+    path = await service.get_transcript(student_id)
+    record_access(claims.subject, "transcript.download", student_id, ip=request.client.host if request.client else None)
 
-    return results
+    return file_response(path, "application/pdf", filename=f"transcript-{student_id}.pdf")
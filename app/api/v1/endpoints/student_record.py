@@ -1,19 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List
+from typing import List, Optional
+from app.api.v1.dependencies import TokenClaims, authorize_student, require_scope
+from app.core.config import settings
+from app.core.file_delivery import file_response, offloaded
+from app.core.fields import FIELDS_DESCRIPTION, parse_fields
+from app.core.etag import etag_headers, etag_matches, make_etag, not_modified
+from app.core.responses import FastJSONResponse
+from app.db.columns import model_columns
 from app.db.session import get_db
 from app.models.student_record import StudentRecord
-from app.schemas.student_record import StudentRecordSchema
-import os
-from fastapi.responses import FileResponse
+from app.schemas.student_record import StudentRecordSchema, StudentSearchHitSchema
+from app.services.AuditService import record_access
+from app.services.PhotoService import photo_not_modified, photo_store
+from app.services.StudentSearchService import student_search
+from fastapi import Response
 
 router = APIRouter()
 
-PHOTO_DIRECTORY = "C:/xampp/htdocs/muerp/photograph/"
+STUDENT_FIELDS = tuple(column.key for column in model_columns(StudentRecord))
 
 # ✅ Return list of students
-@router.get("/", response_model=List[StudentRecordSchema])
+@router.get("/", response_model=List[StudentRecordSchema], dependencies=[Depends(require_scope("students:read"))])
 async def read_students(skip: int = 0, limit: int = 10, db: AsyncSession = Depends(get_db)):
     stmt = select(StudentRecord).offset(skip).limit(limit)
     result = await db.execute(stmt)
@@ -21,49 +30,75 @@ async def read_students(skip: int = 0, limit: int = 10, db: AsyncSession = Depen
     return results
 
 
+# ✅ Typeahead search over student ID, name and mobile (per-worker in-memory index)
+@router.get("/search", response_model=List[StudentSearchHitSchema], dependencies=[Depends(require_scope("students:read"))])
+async def search_students(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(20, ge=1, le=100)):
+    index = await student_search.get()
+    return index.search(q, limit)
+
+
 # ✅ Return a single student
-@router.get("/{student_id}", response_model=StudentRecordSchema)
-async def read_student(student_id: str, db: AsyncSession = Depends(get_db)):
-    stmt = select(StudentRecord).where(StudentRecord.student_id == student_id)
+@router.get("/{student_id}", response_model=StudentRecordSchema, response_class=FastJSONResponse)
+async def read_student(
+    student_id: str,
+    request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_db),
+    claims: TokenClaims = Depends(authorize_student),
+):
+    selected = parse_fields(fields, STUDENT_FIELDS)
+    columns = model_columns(StudentRecord)
+    if selected is not None:
+        columns = tuple(getattr(StudentRecord, key) for key in selected)
+
+    stmt = select(*columns).where(StudentRecord.student_id == student_id)
     result = await db.execute(stmt)
-    student = result.scalars().first()  # ✅ .first() instead of .all()
+    student = result.first()  # ✅ .first() instead of .all()
     
     if not student:
         raise HTTPException(
             status_code=404,
             detail="Student not found"
         )
-    return student  # ✅ return single object, not list
 
-DEFAULT_PHOTO = "G:/React App/MuErp/mu_erp_backend/default-avatar.jpg"   
+    record_access(claims.subject, "student.view", student_id, ip=request.client.host if request.client else None)
+
+    etag = make_etag("student", selected, tuple(student))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return FastJSONResponse(student._asdict(), headers=etag_headers(etag))  # ✅ return single object, not list
 
 @router.get("/student-photo/{student_id}")
-async def get_student_photo(student_id: str):
+async def get_student_photo(student_id: str, request: Request, size: Optional[int] = Query(None)):
     """
     Serve a student's photo by their student_id.
     Returns a default photo if the student's photo is not found.
-    Example: GET /api/v1/student-photo/111-118-001
+    ?size= returns a thumbnail that fits size x size (one of PHOTO_VARIANT_SIZES).
+    Supports If-None-Match / If-Modified-Since revalidation.
+    Example: GET /api/v1/student-photo/111-118-001?size=128
     """
-    filename = f"{student_id}.jpg"
-    filepath = os.path.join(PHOTO_DIRECTORY, filename)
+    if size is not None and size not in settings.PHOTO_VARIANT_SIZES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"size must be one of {settings.PHOTO_VARIANT_SIZES}"
+        )
 
-    # Use default photo if student photo does not exist
-    if not os.path.exists(filepath):
-        filepath = DEFAULT_PHOTO
+    photo = await photo_store.lookup(student_id, size)
+    if photo is None:
+        raise HTTPException(status_code=404, detail="Photo not found")
 
-    # Return the image as a FileResponse
-    return FileResponse(filepath, media_type="image/jpeg")
+    if photo_not_modified(request, photo):
+        return Response(status_code=304, headers=photo.headers())
+
+    # Hot photos come from memory unless the proxy is sending files
+    content = None if offloaded() else await photo_store.read(photo)
+    if content is None:
+        return file_response(photo.path, "image/jpeg", photo.headers())
+    return Response(content, media_type="image/jpeg", headers=photo.headers())
 
 """@router.get("/{student_id}", response_model=StudentRecordSchema)
 def read_student(student_id: int, db: Session = Depends(get_db)):
     student = crud.get_student_record_by_id(db, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
-    return student
-
-@router.get("/search/", response_model=List[StudentRecordSchema])
-def search_students(name: str, db: Session = Depends(get_db)):
-    students = crud.search_student_records(db, name=name)
-    if not students:
-        raise HTTPException(status_code=404, detail="No students found")
-    return students"""
+    return student"""
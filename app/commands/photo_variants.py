@@ -0,0 +1,55 @@
+"""
+Pre-generate photo thumbnails for a whole intake so the first portal visit
+after admission does not pay for resizing.
+
+Usage: python -m app.commands.photo_variants --batch 45 [--section A] [--sizes 64 128]
+"""
+import argparse
+import asyncio
+import time
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.process_pool import render_pool
+from app.db.session import async_session
+from app.models import StudentRecord
+from app.services.PhotoService import photo_store
+
+
+async def generate(batch_name: int, section_name: str = None, sizes=None) -> int:
+    sizes = sizes or settings.PHOTO_VARIANT_SIZES
+
+    stmt = select(StudentRecord.student_id).where(StudentRecord.batchName == batch_name)
+    if section_name:
+        stmt = stmt.where(StudentRecord.sectionName == section_name)
+    async with async_session() as session:
+        student_ids = (await session.execute(stmt.order_by(StudentRecord.student_id.asc()))).scalars().all()
+
+    # Keep every pool worker busy without queueing the whole intake at once
+    window = asyncio.Semaphore(render_pool.max_workers * 2)
+
+    async def one(student_id, size):
+        async with window:
+            await photo_store.lookup(student_id, size)
+
+    await asyncio.gather(*(one(student_id, size) for student_id in student_ids for size in sizes))
+    return len(student_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate student photo thumbnails for an intake")
+    parser.add_argument("--batch", type=int, required=True, help="batchName of the intake")
+    parser.add_argument("--section", help="limit to one section")
+    parser.add_argument("--sizes", type=int, nargs="+", choices=settings.PHOTO_VARIANT_SIZES)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        count = asyncio.run(generate(args.batch, args.section, args.sizes))
+    finally:
+        render_pool.shutdown()
+    print(f"✅ {count} students, sizes {args.sizes or settings.PHOTO_VARIANT_SIZES} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import asyncio
+
+
+class PeriodicTask:
+    """Runs `fn` every `interval` seconds on the event loop until stopped"""
+
+    def __init__(self, name: str, interval: float, fn):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self._task = None
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.fn()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ {self.name} failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_periodic_tasks = []
+
+
+def schedule_periodic(name: str, interval: float, fn) -> PeriodicTask:
+    task = PeriodicTask(name, interval, fn)
+    _periodic_tasks.append(task)
+    task.start()
+    return task
+
+
+async def stop_periodic_tasks():
+    while _periodic_tasks:
+        await _periodic_tasks.pop().stop()
@@ -0,0 +1,152 @@
+import asyncio
+
+_STOP = object()
+
+
+class BatchWriter:
+    """
+    In-process write-behind buffer. submit() never awaits: items are queued
+    and a consumer task hands them to `flush_fn(items)` once `batch_size`
+    items are buffered or `flush_interval` seconds have passed since the
+    first one, so callers never wait on the database.
+
+    When `max_queue` items are already buffered, submit() drops and counts
+    new items rather than growing memory without bound; put() instead waits
+    (up to a timeout) for the consumer to make room, for items that must not
+    be shed. stop() flushes everything still buffered before returning.
+
+    With `coalesce_key`, items in one batch sharing a key are folded into the
+    first with `merge(first, item)` before the flush.
+    """
+
+    def __init__(self, name: str, flush_fn, batch_size: int = 500,
+                 flush_interval: float = 1.0, max_queue: int = 10000,
+                 coalesce_key=None, merge=None):
+        self.name = name
+        self.flush_fn = flush_fn
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.coalesce_key = coalesce_key
+        self.merge = merge
+        self._queue = asyncio.Queue()
+        self._space = asyncio.Event()
+        self._task = None
+        self.submitted = 0
+        self.written = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.waited = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    def submit(self, item) -> bool:
+        if self._queue.qsize() >= self.max_queue:
+            self.dropped += 1
+            return False
+        self._queue.put_nowait(item)
+        self.submitted += 1
+        return True
+
+    async def put(self, item, timeout: float = 1.0) -> bool:
+        """submit() that waits up to `timeout` seconds for room instead of dropping"""
+        if self._queue.qsize() >= self.max_queue:
+            self.waited += 1
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            while self._queue.qsize() >= self.max_queue:
+                self._space.clear()
+                try:
+                    await asyncio.wait_for(self._space.wait(), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    break
+        return self.submit(item)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stopping = False
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._space.set()
+            await self._flush(batch)
+            if stopping:
+                await self._drain()
+                return
+
+    async def _drain(self):
+        batch = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                batch.append(item)
+            if len(batch) >= self.batch_size:
+                await self._flush(batch)
+                batch = []
+        if batch:
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        if self.coalesce_key is not None:
+            batch = self._coalesce(batch)
+        try:
+            await self.flush_fn(batch)
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"❌ {self.name} flush of {len(batch)} failed: {e}")
+        self.flushes += 1
+
+    def _coalesce(self, batch):
+        folded = {}
+        for item in batch:
+            key = self.coalesce_key(item)
+            first = folded.get(key)
+            if first is None:
+                folded[key] = item
+            else:
+                self.merge(first, item)
+                self.coalesced += 1
+        return list(folded.values())
+
+    async def stop(self, timeout: float = 10.0):
+        """Flush what is buffered and stop the consumer"""
+        if self._task is None:
+            return
+        self._queue.put_nowait(_STOP)
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            print(f"❌ {self.name} did not drain within {timeout}s; {self._queue.qsize()} items lost")
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "buffered": self._queue.qsize(),
+            "submitted": self.submitted,
+            "written": self.written,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "waited": self.waited,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
@@ -1,3 +1,4 @@
+from typing import Dict, List, Literal
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,6 +7,88 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Per-worker connection pool (SQLAlchemy's defaults). The dashboard holds up
+    # to three connections per request, so busy portals may want more; keep
+    # workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW), plus the background
+    # refreshers' sessions, under Postgres max_connections (100 by default)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+
+    # CPU-bound work (PDF layout) runs in a process pool off the event loop
+    RENDER_POOL_WORKERS: int = 2
+    TRANSCRIPT_CACHE_DIR: str = "cache/transcripts"
+
+    # IN-list size for multi-student result queries
+    RESULT_BATCH_CHUNK_SIZE: int = 500
+
+    # Grade-distribution aggregates; 0 disables the background refresher
+    ANALYTICS_REFRESH_INTERVAL_SECONDS: int = 300
+
+    # "view" reads vw_result_final_exam directly, "snapshot" reads the local copy
+    RESULT_READ_SOURCE: Literal["view", "snapshot"] = "view"
+    # 0 disables the snapshot refresher. To switch sources, create the snapshot
+    # and watermark tables, set this (e.g. 60) and let the first full copy
+    # finish while still reading the view, then set RESULT_READ_SOURCE=snapshot
+    RESULT_SNAPSHOT_REFRESH_INTERVAL_SECONDS: int = 0
+
+    # Rows per server-side cursor fetch for streaming exports
+    EXPORT_CHUNK_SIZE: int = 1000
+
+    # How often the in-memory curriculum index checks the view for changes
+    CURRICULUM_REFRESH_SECONDS: int = 600
+
+    # Student photos: <PHOTO_DIRECTORY>/<student_id>.jpg, DEFAULT_PHOTO when missing
+    PHOTO_DIRECTORY: str = "C:/xampp/htdocs/muerp/photograph/"
+    DEFAULT_PHOTO: str = "G:/React App/MuErp/mu_erp_backend/default-avatar.jpg"
+    PHOTO_CACHE_CONTROL: str = "public, max-age=3600"
+    # How long a resolved path + stat result is trusted before the disk is checked again
+    PHOTO_LOOKUP_TTL_SECONDS: int = 60
+    PHOTO_LOOKUP_CACHE_SIZE: int = 10000
+    # Per-worker memory budget for hot photo bytes; larger files are streamed from disk
+    PHOTO_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    PHOTO_CACHE_MAX_ITEM_BYTES: int = 512 * 1024
+    # Thumbnail edge lengths accepted by ?size= and where the generated variants live
+    PHOTO_VARIANT_SIZES: List[int] = [64, 128, 256]
+    PHOTO_VARIANT_DIR: str = "cache/photos"
+
+    # How file endpoints hand bytes to the client:
+    #   direct     - FileResponse (zero-copy http.response.pathsend where the server supports it)
+    #   x-accel    - empty response with X-Accel-Redirect to an nginx internal location
+    #   x-sendfile - empty response with X-Sendfile (Apache mod_xsendfile / lighttpd)
+    FILE_DELIVERY_MODE: Literal["direct", "x-accel", "x-sendfile"] = "direct"
+    # Local directory -> nginx internal location, e.g. {"cache/": "/_files/cache/"}
+    X_ACCEL_LOCATIONS: Dict[str, str] = {}
+
+    # In-memory student search: incremental refresh by adm_date, periodic full rebuild
+    SEARCH_REFRESH_INTERVAL_SECONDS: int = 120
+    SEARCH_REBUILD_SECONDS: int = 3600
+
+    # bcrypt runs in its own process pool; calls queued beyond MAX_PENDING get a 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Per-worker token subject -> account cache behind every authenticated route
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_SIZE: int = 10000
+
+    # Student IDs (tbl_o_student_user primary key, which users cannot change)
+    # given the staff / admin role at login; tbl_o_student_user has no role
+    # column, so everyone else signs in as a student
+    STAFF_IDS: List[str] = []
+    ADMIN_IDS: List[str] = []
+
+    # Login events are buffered and written in multi-row batches
+    LOGIN_EVENT_BATCH_SIZE: int = 200
+    LOGIN_EVENT_FLUSH_SECONDS: float = 1.0
+    LOGIN_EVENT_QUEUE_SIZE: int = 10000
+
+    # Audit events: coalesced per flush window, written in multi-row batches.
+    # Reads are shed when the buffer is full; account changes wait up to PUT_TIMEOUT
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_SECONDS: float = 2.0
+    AUDIT_QUEUE_SIZE: int = 20000
+    AUDIT_PUT_TIMEOUT_SECONDS: float = 1.0
+
     class Config:
         env_file = ".env"
 
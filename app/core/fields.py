@@ -0,0 +1,27 @@
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import HTTPException
+
+FIELDS_DESCRIPTION = "Comma-separated subset of response fields (default: all)"
+
+
+@lru_cache(maxsize=512)
+def parse_fields(fields: Optional[str], allowed: tuple) -> Optional[tuple]:
+    """
+    ?fields=per_name,programmeCode -> ("per_name", "programmeCode"), ordered
+    as in `allowed` so equal sets share SQL, cache entries and ETags.
+    None when the parameter is absent (every field).
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    if not requested:
+        raise HTTPException(status_code=400, detail="fields must name at least one field")
+    return tuple(name for name in allowed if name in requested)
@@ -0,0 +1,60 @@
+import os
+from urllib.parse import quote
+
+from fastapi import Response
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+
+
+def _accel_locations():
+    """(real directory, internal location) pairs, longest directory first"""
+    locations = [
+        (os.path.join(os.path.realpath(directory), ""), location.rstrip("/") + "/")
+        for directory, location in settings.X_ACCEL_LOCATIONS.items()
+    ]
+    return sorted(locations, key=lambda item: len(item[0]), reverse=True)
+
+
+ACCEL_LOCATIONS = _accel_locations()
+
+
+def offloaded() -> bool:
+    """True when the front proxy, not Python, sends file bodies"""
+    return settings.FILE_DELIVERY_MODE != "direct"
+
+
+def accel_uri(path: str):
+    real_path = os.path.realpath(path)
+    for directory, location in ACCEL_LOCATIONS:
+        if real_path.startswith(directory):
+            return location + quote(os.path.relpath(real_path, directory).replace(os.sep, "/"))
+    return None
+
+
+def file_response(path: str, media_type: str, headers: dict = None, filename: str = None) -> Response:
+    """
+    Send a file the endpoint has already authorized and resolved.
+
+    In the offload modes the response carries no body: the proxy swaps it
+    for the file named in X-Accel-Redirect / X-Sendfile. A path outside every
+    X_ACCEL_LOCATIONS directory falls back to a direct FileResponse.
+    """
+    headers = dict(headers or {})
+    mode = settings.FILE_DELIVERY_MODE
+
+    offload = None
+    if mode == "x-accel":
+        uri = accel_uri(path)
+        if uri is not None:
+            offload = ("X-Accel-Redirect", uri)
+    elif mode == "x-sendfile":
+        offload = ("X-Sendfile", os.path.realpath(path))
+
+    if offload is None:
+        return FileResponse(path, media_type=media_type, headers=headers, filename=filename)
+
+    headers[offload[0]] = offload[1]
+    if filename:
+        headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quote(filename)}"
+    return Response(media_type=media_type, headers=headers)
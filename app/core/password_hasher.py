@@ -0,0 +1,75 @@
+import time
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.process_pool import ProcessPool
+from app.core.security import get_password_hash, verify_password
+
+
+class PasswordHasher:
+    """
+    bcrypt hash/verify in a dedicated process pool, so a login rush uses
+    every core and never blocks the event loop.
+
+    At most `max_pending` calls may be queued or running per uvicorn worker; beyond
+    that callers get a 503 with Retry-After instead of an ever-growing queue.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.pool = ProcessPool(max_workers)
+        self.max_pending = max_pending
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-in requests, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        start = time.perf_counter()
+        try:
+            result = await self.pool.run(fn, *args)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+            self.busy_seconds += time.perf_counter() - start
+        self.completed += 1
+        return result
+
+    def stats(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "workers": self.pool.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "peak_pending": self.peak_pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_latency_ms": round(1000 * self.busy_seconds / finished, 1) if finished else None,
+        }
+
+    def shutdown(self):
+        self.pool.shutdown()
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as far as request handlers need to know"""
+    student_id: str
+    login_id: str
+    is_active: bool
+
+
+# Per-worker cache of token subject (login_id) -> Principal. Entries expire
+# after PRINCIPAL_CACHE_TTL_SECONDS, so a change made by another worker is
+# seen within that window; changes made here are invalidated immediately.
+principal_cache = TTLCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def invalidate_principal(*subjects):
+    for subject in subjects:
+        if subject:
+            principal_cache.pop(subject)
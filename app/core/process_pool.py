@@ -0,0 +1,41 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from app.core.config import settings
+
+
+class ProcessPool:
+    """
+    Lazily started process pool for CPU-bound work (PDF layout, image
+    resizing) so it never runs on the uvicorn event loop.
+    Submitted callables and their arguments must be picklable.
+
+    Workers are spawned, not forked: the pool starts inside a running event
+    loop whose to_thread workers may hold locks a forked child would inherit.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+render_pool = ProcessPool(settings.RENDER_POOL_WORKERS)
@@ -0,0 +1,44 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+
+def json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def decimal_str(value):
+    """
+    An Optional[Decimal] schema field as response_model serializes it
+    (a string such as "3.5"), for payloads returned without validation
+    """
+    if value is None:
+        return None
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return str(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for payloads that are already plain dicts/lists.
+
+    Returning it from a route skips FastAPI's response_model validation and
+    jsonable_encoder pass; the response_model is then only used for the docs.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json.dumps(
+            content,
+            default=json_default,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
@@ -2,6 +2,8 @@ from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 
+from app.core.config import settings
+
 # to get a string like this run: openssl rand -hex 32
 SECRET_KEY = "your-secret-key"
 ALGORITHM = "HS256"
@@ -9,6 +11,15 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Scopes granted per role and embedded in the access token. A token always
+# grants access to its own student_id; "students:read" grants any student,
+# "admin" the operational endpoints (snapshot/aggregate refresh).
+ROLE_SCOPES = {
+    "student": [],
+    "staff": ["students:read"],
+    "admin": ["students:read", "admin"],
+}
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -25,6 +36,26 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def login_role(student_id: str) -> str:
+    """
+    Role for a user, from the configured staff/admin student IDs. Keyed on
+    the primary key and matched exactly: login IDs can be changed by their owner.
+    """
+    if student_id in settings.ADMIN_IDS:
+        return "admin"
+    if student_id in settings.STAFF_IDS:
+        return "staff"
+    return "student"
+
+def access_token_claims(login_id: str, student_id: str = None, role: str = "student") -> dict:
+    """Claims for create_access_token, so routes can authorize from the token alone"""
+    return {
+        "sub": login_id,
+        "student_id": student_id,
+        "role": role,
+        "scope": " ".join(ROLE_SCOPES.get(role, [])),
+    }
+
 def generate_reset_token(email: str) -> str:
     """
     Generate a short-lived JWT token for password reset.
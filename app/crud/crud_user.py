@@ -2,7 +2,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.user import User
 from app.schemas.auth import UserCreate
-from app.core.security import get_password_hash
+from app.core.password_hasher import password_hasher
 
 class CRUDUser:
     async def get_by_username(self, db: AsyncSession, username: str) -> User | None:
@@ -17,7 +17,7 @@ class CRUDUser:
         db_user = User(
             username=user_in.username,
             email=user_in.email,
-            hashed_password=get_password_hash(user_in.password),
+            hashed_password=await password_hasher.hash(user_in.password),
         )
         db.add(db_user)
         await db.commit()
@@ -0,0 +1,12 @@
+from functools import lru_cache
+
+from sqlalchemy import inspect
+
+
+@lru_cache(maxsize=None)
+def model_columns(model) -> tuple:
+    """
+    Column attributes of an ORM model in mapper order. Selecting them returns
+    lightweight Rows keyed by attribute name (row._asdict() matches the schemas).
+    """
+    return tuple(getattr(model, prop.key) for prop in inspect(model).column_attrs)
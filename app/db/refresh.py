@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+
+from app.models import RefreshWatermark
+
+# asyncpg accepts at most 32767 bind parameters per statement
+MAX_BIND_PARAMS = 32767
+
+
+def rows_per_statement(table) -> int:
+    """Most rows one multi-row INSERT into `table` can carry (one parameter per column per row)"""
+    return MAX_BIND_PARAMS // len(table.columns)
+
+
+async def begin_refresh(db: AsyncSession, lock_key: int, name: str):
+    """
+    Take the refresher's transaction-scoped advisory lock and return its
+    watermark row (created on the first run). Returns None, with the
+    transaction rolled back, when another worker is already refreshing.
+    """
+    locked = await db.scalar(select(func.pg_try_advisory_xact_lock(lock_key)))
+    if not locked:
+        await db.rollback()
+        return None
+
+    mark = await db.get(RefreshWatermark, name)
+    if mark is None:
+        mark = RefreshWatermark(name=name, rows_refreshed=0)
+        db.add(mark)
+    return mark
+
+
+def since_watermark(stmt, column, watermark):
+    """
+    Rows at or after the watermark (all rows when there is none yet).
+    >= rather than >, so rows stamped with the watermark itself after the
+    last run are picked up; re-reading the boundary rows is harmless.
+    """
+    if watermark is None:
+        return stmt
+    return stmt.where(column >= watermark)
+
+
+def finish_refresh(mark: RefreshWatermark, watermark, rows_refreshed: int):
+    mark.watermark = watermark
+    mark.refreshed_at = datetime.utcnow()
+    mark.rows_refreshed = rows_refreshed
+
+
+def upsert(table, rows):
+    """Multi-row INSERT ... ON CONFLICT (primary key) DO UPDATE of every other column"""
+    stmt = insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[column for column in table.primary_key.columns],
+        set_={
+            column.name: stmt.excluded[column.name]
+            for column in table.columns
+            if not column.primary_key
+        },
+    )
@@ -3,7 +3,12 @@ from app.core.config import settings
 
 DATABASE_URL = settings.SQLALCHEMY_DATABASE_URL
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+)
 
 async_session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -1,6 +1,15 @@
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
-from app.api.v1.endpoints import auth, result_final_exam, student_record, course_enrollment, frontend
+from app.api.v1.endpoints import auth, result_final_exam, student_record, course_enrollment, frontend, analytics, degree_audit, dashboard
+from app.core.background import schedule_periodic, stop_periodic_tasks
+from app.core.config import settings
+from app.core.password_hasher import password_hasher
+from app.core.process_pool import render_pool
+from app.services.AnalyticsService import refresh_module_aggregates
+from app.services.ResultSnapshotService import refresh_result_snapshot
+from app.services.StudentSearchService import refresh_student_search
+from app.services.LoginEventService import login_event_writer
+from app.services.AuditService import audit_writer
 import uvicorn
 from datetime import datetime, timedelta
 #app = FastAPI()
@@ -26,6 +35,9 @@ app.include_router(frontend.router, prefix="/frontend", tags=["Frontend"])
 app.include_router(result_final_exam.router, prefix="/api/v1/result", tags=["result"])
 app.include_router(student_record.router, prefix="/api/v1/student-record", tags=["student-record"])
 app.include_router(course_enrollment.router, prefix="/api/v1/course", tags=["course"])
+app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["analytics"])
+app.include_router(degree_audit.router, prefix="/api/v1/degree-audit", tags=["degree-audit"])
+app.include_router(dashboard.router, prefix="/api/v1/dashboard", tags=["dashboard"])
 
 
 @app.get("/", tags=["Root"])
@@ -47,7 +59,13 @@ async def root():
 @app.get("/health", tags=["System"])
 async def health():
     """Health check endpoint"""
-    return {"status": "ok", "timestamp": datetime.now().isoformat()}
+    return {
+        "status": "ok",
+        "timestamp": datetime.now().isoformat(),
+        "password_hasher": password_hasher.stats(),
+        "login_events": login_event_writer.stats(),
+        "audit_events": audit_writer.stats(),
+    }
 # ------------------------------
 # For Local Testing
 # ------------------------------
@@ -70,6 +88,37 @@ async def startup_event():
     print(f"🌐 Server running on: http://localhost:8000")
     print("=" * 60)
 
+    login_event_writer.start()
+    audit_writer.start()
+
+    if settings.RESULT_READ_SOURCE == "snapshot" and settings.RESULT_SNAPSHOT_REFRESH_INTERVAL_SECONDS <= 0:
+        print("⚠️  RESULT_READ_SOURCE=snapshot but the snapshot refresher is disabled; results will go stale")
+
+    schedule_periodic(
+        "module-grade-aggregates",
+        settings.ANALYTICS_REFRESH_INTERVAL_SECONDS,
+        refresh_module_aggregates,
+    )
+    schedule_periodic(
+        "result-snapshot",
+        settings.RESULT_SNAPSHOT_REFRESH_INTERVAL_SECONDS,
+        refresh_result_snapshot,
+    )
+    schedule_periodic(
+        "student-search-index",
+        settings.SEARCH_REFRESH_INTERVAL_SECONDS,
+        refresh_student_search,
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_periodic_tasks()
+    await login_event_writer.stop()
+    await audit_writer.stop()
+    render_pool.shutdown()
+    password_hasher.shutdown()
+
 
 if __name__ == "__main__":
     import uvicorn
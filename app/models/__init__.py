@@ -1,4 +1,10 @@
 from .user import User
 from .person import Person
 from .result_final_exam import ResultFinalExam
-from .student_record import StudentRecord
\ No newline at end of file
+from .student_record import StudentRecord
+from .refresh_watermark import RefreshWatermark
+from .module_grade_aggregate import ModuleGradeAggregate
+from .result_snapshot import ResultSnapshot
+from .curriculum import CurriculumModule
+from .login_event import LoginEvent
+from .audit_event import AuditEvent
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, BigInteger, DateTime, Index, Integer, String
+from app.db.base import Base
+
+
+class AuditEvent(Base):
+    """
+    Append-only audit trail of sensitive reads and account changes.
+    Repeats of the same (actor, action, target) within one flush window are
+    stored once with `count` and the first/last time seen.
+    """
+    __tablename__ = "tbl_o_audit_event"
+    __table_args__ = (
+        Index("ix_audit_event_target_occurred", "targetStudentID", "occurredAt"),
+        Index("ix_audit_event_actor_occurred", "actor", "occurredAt"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    actor = Column(String(200))
+    action = Column(String(50), nullable=False)
+    target_student_id = Column("targetStudentID", String)
+    detail = Column(String(255))
+    ip = Column(String(45))
+    occurred_at = Column("occurredAt", DateTime, nullable=False)
+    last_occurred_at = Column("lastOccurredAt", DateTime, nullable=False)
+    count = Column(Integer, nullable=False, default=1)
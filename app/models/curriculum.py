@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Float
+from app.db.base import Base
+
+
+class CurriculumModule(Base):
+    """Modules a programme's curriculum requires (ERP view)"""
+    __tablename__ = "vw_programme_curriculum"
+
+    programme_code = Column("programmeCode", String(20), primary_key=True)
+    module_code = Column("moduleCode", String, primary_key=True)
+    mod_name = Column("mod_name", String)
+    mod_credit_hour = Column("mod_creditHour", Float)
+    mod_group = Column("mod_group", String)
+    mod_type = Column("mod_type", String)
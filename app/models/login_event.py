@@ -0,0 +1,18 @@
+from sqlalchemy import Column, BigInteger, Boolean, DateTime, Index, String
+from app.db.base import Base
+
+
+class LoginEvent(Base):
+    """Append-only login history; replaces rewriting usr_loginLog on the user row"""
+    __tablename__ = "tbl_o_login_event"
+    __table_args__ = (
+        Index("ix_login_event_student_occurred", "studentID", "occurredAt"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    student_id = Column("studentID", String)
+    login_id = Column("loginID", String(200))
+    ip = Column(String(45))
+    user_agent = Column("userAgent", String(255))
+    success = Column(Boolean, nullable=False)
+    occurred_at = Column("occurredAt", DateTime, nullable=False)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON
+from app.db.base import Base
+
+
+class ModuleGradeAggregate(Base):
+    """Precomputed grade distribution per offered module and exam term"""
+    __tablename__ = "tbl_o_module_grade_aggregate"
+
+    offered_module_id = Column("offeredModuleID", Integer, primary_key=True)
+    exam_year = Column("exm_examYear", Integer, primary_key=True)
+    exam_term = Column("exm_examTerm", Integer, primary_key=True)
+
+    module_code = Column("moduleCode", String)
+    mod_name = Column("mod_name", String)
+    faculty_id = Column("facultyID", Integer, index=True)
+
+    grade_histogram = Column("gradeHistogram", JSON)   # letter grade -> count
+    graded_count = Column("gradedCount", Integer, nullable=False, default=0)
+    pass_count = Column("passCount", Integer, nullable=False, default=0)
+    fail_count = Column("failCount", Integer, nullable=False, default=0)
+    grade_point_sum = Column("gradePointSum", Float, nullable=False, default=0)
+
+    last_emr_date = Column("lastEmrDate", DateTime)
+    refreshed_at = Column("refreshedAt", DateTime)
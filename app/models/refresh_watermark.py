@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from app.db.base import Base
+
+
+class RefreshWatermark(Base):
+    """Last `emr_date` pulled by an incremental refresher (one row per refresher)"""
+    __tablename__ = "tbl_o_refresh_watermark"
+
+    name = Column(String(50), primary_key=True)
+    watermark = Column(DateTime)
+    refreshed_at = Column(DateTime)
+    rows_refreshed = Column(Integer, default=0)
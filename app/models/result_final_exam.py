@@ -2,8 +2,8 @@ from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Numeri
 from app.db.base import Base
 
 
-class ResultFinalExam(Base):
-    __tablename__ = "vw_result_final_exam"
+class ResultFinalExamColumns:
+    """Columns of vw_result_final_exam, shared with the local snapshot table"""
 
     # Composite PK for uniqueness
     student_id = Column("studentID", String, primary_key=True)
@@ -43,6 +43,10 @@ class ResultFinalExam(Base):
     faculty_id = Column("facultyID", Integer)
     mod_type = Column("mod_type", String)
 
+
+class ResultFinalExam(ResultFinalExamColumns, Base):
+    __tablename__ = "vw_result_final_exam"
+
     """total = Column("total", Float)
 
     letter_grade = Column("letterGrade", String)
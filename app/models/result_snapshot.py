@@ -0,0 +1,15 @@
+from sqlalchemy import Index
+from app.db.base import Base
+from app.models.result_final_exam import ResultFinalExamColumns
+
+
+class ResultSnapshot(ResultFinalExamColumns, Base):
+    """
+    Local copy of vw_result_final_exam, refreshed incrementally by emr_date.
+    The composite primary key leads with studentID, so per-student reads are
+    an index range scan.
+    """
+    __tablename__ = "tbl_o_result_snapshot"
+    __table_args__ = (
+        Index("ix_result_snapshot_emr_date", "emr_date"),
+    )
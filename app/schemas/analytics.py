@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import Dict, Optional
+from datetime import datetime
+
+
+class GradeDistributionSchema(BaseModel):
+    offered_module_id: int
+    exam_year: int
+    exam_term: str
+
+    module_code: Optional[str]
+    mod_name: Optional[str]
+    faculty_id: Optional[int]
+
+    grade_histogram: Dict[str, int]
+    graded_count: int
+    pass_count: int
+    fail_count: int
+    pass_rate: Optional[float]
+    fail_rate: Optional[float]
+    mean_grade_point: Optional[float]
+
+    refreshed_at: Optional[datetime]
+
+
+class RefreshResponse(BaseModel):
+    groups_refreshed: int
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from decimal import Decimal
 
 class CourseEnrollmentSchema(BaseModel):
@@ -23,3 +23,16 @@ class CourseEnrollmentSchema(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class RosterPageSchema(BaseModel):
+    items: List[CourseEnrollmentSchema]
+    next_cursor: Optional[str]
+
+
+class TermCreditSummarySchema(BaseModel):
+    tra_year: Optional[int]
+    tra_term: Optional[int]
+    module_count: int
+    credit_hours: float
+    lab_count: int
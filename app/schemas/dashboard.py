@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import Dict, List
+
+from app.schemas.course_enrollment import CourseEnrollmentSchema
+from app.schemas.result_final_exam import FormatedResultSchema
+from app.schemas.student_record import StudentRecordSchema
+
+
+class DashboardSchema(BaseModel):
+    student: StudentRecordSchema
+    courses: List[CourseEnrollmentSchema]
+    results: List[FormatedResultSchema]
+    timings_ms: Dict[str, float]
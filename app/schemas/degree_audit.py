@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class CreditBucketSchema(BaseModel):
+    mod_group: Optional[str]
+    mod_type: Optional[str]
+    required_credits: float
+    earned_credits: float
+    remaining_credits: float
+    met: bool
+
+
+class DegreeAuditSchema(BaseModel):
+    student_id: str
+    programme_code: Optional[str]
+
+    # Credit totals are absent when the student could not be audited (see error)
+    required_credits: Optional[float] = None
+    earned_credits: Optional[float] = None
+    remaining_credits: Optional[float] = None
+    completion_percent: Optional[float] = None
+    extra_credits: Optional[float] = None
+
+    buckets: List[CreditBucketSchema]
+    pending_modules: List[str]
+    cleared: bool
+    error: Optional[str] = None
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 
@@ -38,6 +38,9 @@ class FormatedResultSchema(BaseModel):
     faculty_id: Optional[int]
     mod_type: Optional[str]
 
+    # Only set by the effective / annotated query modes
+    superseded: Optional[bool] = None
+
 class ResultFinalExamSchema(BaseModel):
     #student_id: str
     offered_module_id: int
@@ -105,3 +108,41 @@ class ResultFinalExamSchema(BaseModel):
         json_encoders = {
             Decimal: float  # Convert Decimal to float when returning JSON
         }
+
+
+class TermSummarySchema(BaseModel):
+    exm_exam_year: Optional[int]
+    exm_exam_term: Optional[str]
+
+    credits_attempted: float
+    credits_earned: float
+    supple_credits: float
+
+    sgpa: Optional[float]
+    cgpa: Optional[float]
+
+
+class ResultSummarySchema(BaseModel):
+    student_id: str
+    terms: List[TermSummarySchema]
+
+    credits_attempted: float
+    credits_earned: float
+    cgpa: Optional[float]
+
+
+class ResultBatchRequest(BaseModel):
+    student_ids: List[str] = Field(..., min_length=1)
+
+
+class SnapshotStatusSchema(BaseModel):
+    read_source: str
+    watermark: Optional[datetime]
+    refreshed_at: Optional[datetime]
+    rows_last_refresh: int
+    snapshot_rows: int
+    lag_seconds: Optional[float]
+
+
+class SnapshotRefreshResponse(BaseModel):
+    rows_refreshed: int
@@ -31,3 +31,14 @@ class StudentRecordSchema(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class StudentSearchHitSchema(BaseModel):
+    student_id: str
+    per_name: Optional[str]
+    per_mobile: Optional[str]
+    batchName: Optional[int]
+    pro_shortName: Optional[str]
+    programmeCode: Optional[str]
+    adm_date: Optional[date]
+    score: float
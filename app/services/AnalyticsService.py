@@ -0,0 +1,178 @@
+from datetime import datetime
+from sqlalchemy import case, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+from fastapi import HTTPException
+
+from app.db.refresh import begin_refresh, finish_refresh, since_watermark, upsert
+from app.db.session import async_session
+from app.models import ModuleGradeAggregate, ResultFinalExam
+from app.services.ResultService import TERM_LABELS
+
+WATERMARK_NAME = "module_grade_aggregate"
+
+# pg_try_advisory_xact_lock key so only one worker refreshes at a time
+REFRESH_LOCK_KEY = 7_301_001
+
+# Aggregate groups recomputed per query
+REFRESH_CHUNK_SIZE = 500
+
+
+class AnalyticsService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # --------------------
+    # Reads (primary-key / indexed lookups)
+    # --------------------
+    async def get_module_distributions(self, offered_module_id: int, exam_year: int = None, exam_term: int = None):
+        stmt = select(ModuleGradeAggregate).where(ModuleGradeAggregate.offered_module_id == offered_module_id)
+        if exam_year is not None:
+            stmt = stmt.where(ModuleGradeAggregate.exam_year == exam_year)
+        if exam_term is not None:
+            stmt = stmt.where(ModuleGradeAggregate.exam_term == exam_term)
+        stmt = stmt.order_by(ModuleGradeAggregate.exam_year.asc(), ModuleGradeAggregate.exam_term.asc())
+
+        result = await self.db.execute(stmt)
+        aggregates = result.scalars().all()
+        if not aggregates:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No grade distribution found for offered module {offered_module_id}"
+            )
+        return [self.to_distribution(aggregate) for aggregate in aggregates]
+
+    async def get_faculty_distributions(self, faculty_id: int, exam_year: int = None, exam_term: int = None):
+        stmt = select(ModuleGradeAggregate).where(ModuleGradeAggregate.faculty_id == faculty_id)
+        if exam_year is not None:
+            stmt = stmt.where(ModuleGradeAggregate.exam_year == exam_year)
+        if exam_term is not None:
+            stmt = stmt.where(ModuleGradeAggregate.exam_term == exam_term)
+        stmt = stmt.order_by(
+            ModuleGradeAggregate.exam_year.desc(),
+            ModuleGradeAggregate.exam_term.desc(),
+            ModuleGradeAggregate.module_code.asc(),
+        )
+
+        result = await self.db.execute(stmt)
+        return [self.to_distribution(aggregate) for aggregate in result.scalars().all()]
+
+    def to_distribution(self, aggregate: ModuleGradeAggregate) -> dict:
+        graded = aggregate.graded_count or 0
+        return {
+            "offered_module_id": aggregate.offered_module_id,
+            "exam_year": aggregate.exam_year,
+            "exam_term": TERM_LABELS.get(aggregate.exam_term, 'Not Specified'),
+            "module_code": aggregate.module_code,
+            "mod_name": aggregate.mod_name,
+            "faculty_id": aggregate.faculty_id,
+            "grade_histogram": aggregate.grade_histogram or {},
+            "graded_count": graded,
+            "pass_count": aggregate.pass_count,
+            "fail_count": aggregate.fail_count,
+            "pass_rate": round(aggregate.pass_count / graded, 4) if graded else None,
+            "fail_rate": round(aggregate.fail_count / graded, 4) if graded else None,
+            "mean_grade_point": round(aggregate.grade_point_sum / graded, 2) if graded else None,
+            "refreshed_at": aggregate.refreshed_at,
+        }
+
+    # --------------------
+    # Incremental refresh
+    # --------------------
+    async def refresh_aggregates(self) -> int:
+        """
+        Recompute only the (offered module, year, term) groups that have
+        result rows at or after the stored emr_date watermark.
+        Returns the number of groups refreshed (-1 if another worker holds the lock).
+        """
+        mark = await begin_refresh(self.db, REFRESH_LOCK_KEY, WATERMARK_NAME)
+        if mark is None:
+            return -1
+
+        group_key = (
+            ResultFinalExam.offered_module_id,
+            ResultFinalExam.exm_exam_year,
+            ResultFinalExam.exm_exam_term,
+        )
+        changed = select(*group_key, func.max(ResultFinalExam.emr_date)).group_by(*group_key)
+        changed = since_watermark(changed, ResultFinalExam.emr_date, mark.watermark)
+        changed_groups = (await self.db.execute(changed)).all()
+
+        keys = [tuple(row[:3]) for row in changed_groups]
+        for start in range(0, len(keys), REFRESH_CHUNK_SIZE):
+            await self._recompute(keys[start:start + REFRESH_CHUNK_SIZE])
+
+        latest = [row[3] for row in changed_groups if row[3] is not None]
+        watermark = max([mark.watermark or latest[0]] + latest) if latest else mark.watermark
+        finish_refresh(mark, watermark, len(keys))
+        await self.db.commit()
+        return len(keys)
+
+    async def _recompute(self, keys):
+        group_key = (
+            ResultFinalExam.offered_module_id,
+            ResultFinalExam.exm_exam_year,
+            ResultFinalExam.exm_exam_term,
+        )
+        stmt = (select(
+                *group_key,
+                ResultFinalExam.letter_grade,
+                func.count(),
+                func.sum(ResultFinalExam.grade_point),
+                func.sum(case((ResultFinalExam.grade_point > 0, 1), else_=0)),
+                func.max(ResultFinalExam.module_code),
+                func.max(ResultFinalExam.mod_name),
+                func.max(ResultFinalExam.faculty_id),
+                func.max(ResultFinalExam.emr_date),
+            )
+            .where(
+                tuple_(*group_key).in_(keys),
+                ResultFinalExam.grade_point.isnot(None),
+            )
+            .group_by(*group_key, ResultFinalExam.letter_grade)
+        )
+        rows = (await self.db.execute(stmt)).all()
+
+        now = datetime.utcnow()
+        groups = {}
+        for (offered_module_id, year, term, letter, count, point_sum, passed,
+             module_code, mod_name, faculty_id, last_emr_date) in rows:
+            group = groups.get((offered_module_id, year, term))
+            if group is None:
+                group = groups[(offered_module_id, year, term)] = {
+                    "offered_module_id": offered_module_id,
+                    "exam_year": year,
+                    "exam_term": term,
+                    "module_code": module_code,
+                    "mod_name": mod_name,
+                    "faculty_id": faculty_id,
+                    "grade_histogram": {},
+                    "graded_count": 0,
+                    "pass_count": 0,
+                    "fail_count": 0,
+                    "grade_point_sum": 0.0,
+                    "last_emr_date": last_emr_date,
+                    "refreshed_at": now,
+                }
+            group["grade_histogram"][letter or "N/A"] = count
+            group["graded_count"] += count
+            group["pass_count"] += passed
+            group["fail_count"] += count - passed
+            group["grade_point_sum"] += float(point_sum or 0)
+            if last_emr_date and (group["last_emr_date"] is None or last_emr_date > group["last_emr_date"]):
+                group["last_emr_date"] = last_emr_date
+
+        if not groups:
+            return
+
+        await self.db.execute(upsert(ModuleGradeAggregate.__table__, [
+            {ModuleGradeAggregate.__mapper__.c[key].name: value for key, value in group.items()}
+            for group in groups.values()
+        ]))
+
+
+async def refresh_module_aggregates():
+    """Entry point for the background refresher"""
+    async with async_session() as session:
+        await AnalyticsService(session).refresh_aggregates()
@@ -0,0 +1,61 @@
+from datetime import datetime
+from sqlalchemy import insert
+
+from app.core.batch_writer import BatchWriter
+from app.core.config import settings
+from app.db.session import async_session
+from app.models import AuditEvent
+
+
+async def write_audit_events(events):
+    """One multi-row INSERT per (coalesced) batch"""
+    async with async_session() as session:
+        await session.execute(insert(AuditEvent), events)
+        await session.commit()
+
+
+def audit_key(event):
+    return (event["actor"], event["action"], event["target_student_id"], event["detail"], event["ip"])
+
+
+def merge_audit(first, event):
+    first["count"] += 1
+    first["last_occurred_at"] = event["last_occurred_at"]
+
+
+audit_writer = BatchWriter(
+    "audit-events",
+    write_audit_events,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_SECONDS,
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+    coalesce_key=audit_key,
+    merge=merge_audit,
+)
+
+
+def audit_event(actor, action: str, target_student_id: str = None, detail: str = None, ip: str = None) -> dict:
+    now = datetime.utcnow()
+    return {
+        "actor": actor,
+        "action": action,
+        "target_student_id": target_student_id,
+        "detail": detail[:255] if detail else None,
+        "ip": ip,
+        "occurred_at": now,
+        "last_occurred_at": now,
+        "count": 1,
+    }
+
+
+def record_access(actor, action: str, target_student_id: str = None, detail: str = None, ip: str = None):
+    """Sensitive reads: queued without waiting; shed (and counted) when the buffer is full"""
+    audit_writer.submit(audit_event(actor, action, target_student_id, detail, ip))
+
+
+async def record_change(actor, action: str, target_student_id: str = None, detail: str = None, ip: str = None):
+    """Account changes: waits briefly for buffer room rather than being shed"""
+    await audit_writer.put(
+        audit_event(actor, action, target_student_id, detail, ip),
+        timeout=settings.AUDIT_PUT_TIMEOUT_SECONDS,
+    )
@@ -0,0 +1,170 @@
+import base64
+import csv
+import io
+import json
+from sqlalchemy import case, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.responses import decimal_str
+from app.db.columns import model_columns
+from app.db.session import async_session
+from app.models.course_enrollment import CourseEnrollment
+
+
+ENROLLMENT_FIELDS = tuple(column.key for column in model_columns(CourseEnrollment))
+
+
+def enrollment_response(row) -> dict:
+    """Row -> CourseEnrollmentSchema wire format (mod_credit_hour is Optional[Decimal], so a string)"""
+    item = row._asdict()
+    if "mod_credit_hour" in item:
+        item["mod_credit_hour"] = decimal_str(item["mod_credit_hour"])
+    return item
+
+
+class CourseEnrollmentService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def fetch_by_student(self, student_id: str, tra_year: int = None, tra_term: int = None,
+                               reg_status: str = None, fields: tuple = None):
+        """
+        A student's registrations as Row tuples keyed like CourseEnrollmentSchema,
+        or only the `fields` columns when given
+        """
+        columns = model_columns(CourseEnrollment)
+        if fields is not None:
+            columns = tuple(getattr(CourseEnrollment, key) for key in fields)
+        stmt = (
+            select(*columns)
+            .where(*self.student_filters(student_id, tra_year, tra_term, reg_status))
+            .order_by(
+                CourseEnrollment.tra_year.asc(),
+                CourseEnrollment.tra_term.asc(),
+            )
+        )
+        result = await self.db.execute(stmt)
+        return result.all()
+
+    async def credit_summary(self, student_id: str, tra_year: int = None, tra_term: int = None,
+                             reg_status: str = None):
+        """Per-term module count, credit hours and lab count, aggregated in SQL"""
+        stmt = (
+            select(
+                CourseEnrollment.tra_year,
+                CourseEnrollment.tra_term,
+                func.count().label("module_count"),
+                func.coalesce(func.sum(CourseEnrollment.mod_credit_hour), 0).label("credit_hours"),
+                func.sum(case((CourseEnrollment.mod_lab_included.is_(True), 1), else_=0)).label("lab_count"),
+            )
+            .where(*self.student_filters(student_id, tra_year, tra_term, reg_status))
+            .group_by(CourseEnrollment.tra_year, CourseEnrollment.tra_term)
+            .order_by(
+                CourseEnrollment.tra_year.asc(),
+                CourseEnrollment.tra_term.asc(),
+            )
+        )
+        result = await self.db.execute(stmt)
+        return [row._asdict() for row in result.all()]
+
+    def student_filters(self, student_id, tra_year=None, tra_term=None, reg_status=None):
+        filters = [CourseEnrollment.student_id == student_id]
+        if tra_year is not None:
+            filters.append(CourseEnrollment.tra_year == tra_year)
+        if tra_term is not None:
+            filters.append(CourseEnrollment.tra_term == tra_term)
+        if reg_status is not None:
+            filters.append(CourseEnrollment.reg_status == reg_status)
+        return filters
+
+    # --------------------
+    # Class roster (keyset pagination)
+    # --------------------
+    def roster_statement(self, module_code: str, tra_year: int, tra_term: int,
+                         batch_name: int = None, section_name: str = None, after=None):
+        """
+        Roster ordered by (studentID, moduleRegistrationID). Pages continue
+        from the last key seen with a row-value comparison instead of OFFSET,
+        so every page costs the same index range scan.
+        """
+        stmt = select(*model_columns(CourseEnrollment)).where(
+            CourseEnrollment.module_code == module_code,
+            CourseEnrollment.tra_year == tra_year,
+            CourseEnrollment.tra_term == tra_term,
+        )
+        if batch_name is not None:
+            stmt = stmt.where(CourseEnrollment.batch_name == batch_name)
+        if section_name:
+            stmt = stmt.where(CourseEnrollment.section_name == section_name)
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(CourseEnrollment.student_id, CourseEnrollment.moduleRegistration_ID) > tuple_(*after)
+            )
+        return stmt.order_by(
+            CourseEnrollment.student_id.asc(),
+            CourseEnrollment.moduleRegistration_ID.asc(),
+        )
+
+    async def roster_page(self, module_code, tra_year, tra_term, batch_name=None, section_name=None,
+                          cursor: str = None, limit: int = 50) -> dict:
+        after = decode_roster_cursor(cursor) if cursor else None
+        stmt = self.roster_statement(module_code, tra_year, tra_term, batch_name, section_name, after)
+        rows = (await self.db.execute(stmt.limit(limit + 1))).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_roster_cursor(last.student_id, last.moduleRegistration_ID)
+        return {
+            "items": [enrollment_response(row) for row in rows],
+            "next_cursor": next_cursor,
+        }
+
+
+def encode_roster_cursor(student_id: str, registration_id: int) -> str:
+    raw = json.dumps([student_id, registration_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_roster_cursor(cursor: str):
+    try:
+        student_id, registration_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(student_id), int(registration_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid roster cursor")
+
+
+async def export_roster_csv(module_code, tra_year, tra_term, batch_name=None, section_name=None):
+    """
+    Yield the whole roster as CSV, walking keyset pages of EXPORT_CHUNK_SIZE
+    rows on a session owned by the generator, so memory stays constant.
+    """
+    columns = [column.key for column in model_columns(CourseEnrollment)]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    async with async_session() as session:
+        service = CourseEnrollmentService(session)
+        after = None
+        while True:
+            stmt = service.roster_statement(module_code, tra_year, tra_term, batch_name, section_name, after)
+            rows = (await session.execute(stmt.limit(settings.EXPORT_CHUNK_SIZE))).all()
+            if not rows:
+                break
+
+            buffer.seek(0)
+            buffer.truncate(0)
+            writer.writerows(rows)
+            yield buffer.getvalue()
+
+            last = rows[-1]
+            after = (last.student_id, last.moduleRegistration_ID)
+            if len(rows) < settings.EXPORT_CHUNK_SIZE:
+                break
@@ -0,0 +1,63 @@
+import asyncio
+import time
+from sqlalchemy.future import select
+from fastapi import HTTPException
+
+from app.db.columns import model_columns
+from app.db.session import async_session
+from app.models import StudentRecord
+from app.services.CourseEnrollmentService import CourseEnrollmentService, enrollment_response
+from app.services.ResultService import ResultService
+
+
+class DashboardService:
+    """
+    Portal home page payload. The student record, enrollments and results are
+    loaded concurrently, each on its own pooled session, so the request costs
+    the slowest query instead of the sum of all three.
+    """
+
+    async def load(self, student_id: str) -> dict:
+        timings = {}
+        start = time.perf_counter()
+
+        student, courses, results = await asyncio.gather(
+            self._timed("student", timings, self._load_student, student_id),
+            self._timed("courses", timings, self._load_courses, student_id),
+            self._timed("results", timings, self._load_results, student_id),
+        )
+        if student is None:
+            raise HTTPException(status_code=404, detail="Student not found")
+
+        timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+        return {
+            "student": student,
+            "courses": courses,
+            "results": results,
+            "timings_ms": timings,
+        }
+
+    async def _timed(self, name, timings, loader, student_id):
+        start = time.perf_counter()
+        try:
+            async with async_session() as session:
+                return await loader(session, student_id)
+        finally:
+            timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    async def _load_student(self, session, student_id):
+        stmt = select(*model_columns(StudentRecord)).where(StudentRecord.student_id == student_id)
+        row = (await session.execute(stmt)).first()
+        return row._asdict() if row else None
+
+    async def _load_courses(self, session, student_id):
+        rows = await CourseEnrollmentService(session).fetch_by_student(student_id)
+        return [enrollment_response(row) for row in rows]
+
+    async def _load_results(self, session, student_id):
+        try:
+            return await ResultService(session).generate_result(student_id)
+        except HTTPException as e:
+            if e.status_code == 404:
+                return []
+            raise
@@ -0,0 +1,218 @@
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import groupby
+from sqlalchemy import literal
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.models import CurriculumModule, StudentRecord
+from app.services.ResultService import ResultService
+
+
+@dataclass
+class ProgrammeCurriculum:
+    programme_code: str
+    modules: dict = field(default_factory=dict)          # module_code -> (credit, (mod_group, mod_type))
+    bucket_required: dict = field(default_factory=dict)  # (mod_group, mod_type) -> credits
+    total_credits: float = 0.0
+
+
+class CurriculumIndex:
+    """
+    Per-worker index of every programme's curriculum keyed by programmeCode.
+
+    At most once every CURRICULUM_REFRESH_SECONDS a single aggregate query
+    fetches a signature per programme; only programmes whose signature
+    changed are reloaded.
+    """
+
+    def __init__(self):
+        self._programmes = {}
+        self._signatures = {}
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self, db: AsyncSession, programme_code: str) -> ProgrammeCurriculum:
+        await self.ensure_fresh(db)
+        return self._programmes.get(programme_code)
+
+    async def ensure_fresh(self, db: AsyncSession):
+        if time.monotonic() - self._checked_at < settings.CURRICULUM_REFRESH_SECONDS:
+            return
+        async with self._lock:
+            if time.monotonic() - self._checked_at < settings.CURRICULUM_REFRESH_SECONDS:
+                return
+
+            row_text = func.concat_ws(
+                ":",
+                CurriculumModule.module_code,
+                CurriculumModule.mod_credit_hour,
+                CurriculumModule.mod_group,
+                CurriculumModule.mod_type,
+            )
+            stmt = (select(
+                    CurriculumModule.programme_code,
+                    func.count(),
+                    func.md5(func.string_agg(row_text, aggregate_order_by(literal(","), CurriculumModule.module_code))),
+                )
+                .group_by(CurriculumModule.programme_code)
+            )
+            signatures = {code: (count, digest) for code, count, digest in (await db.execute(stmt)).all()}
+
+            changed = [code for code, signature in signatures.items() if self._signatures.get(code) != signature]
+            if changed:
+                await self._load(db, changed)
+            for code in set(self._programmes) - set(signatures):
+                del self._programmes[code]
+
+            self._signatures = signatures
+            self._checked_at = time.monotonic()
+
+    async def _load(self, db: AsyncSession, programme_codes):
+        stmt = (select(
+                CurriculumModule.programme_code,
+                CurriculumModule.module_code,
+                CurriculumModule.mod_credit_hour,
+                CurriculumModule.mod_group,
+                CurriculumModule.mod_type,
+            )
+            .where(CurriculumModule.programme_code.in_(programme_codes))
+            .order_by(CurriculumModule.programme_code.asc())
+        )
+        rows = (await db.execute(stmt)).all()
+
+        for programme_code, modules in groupby(rows, key=lambda row: row.programme_code):
+            curriculum = ProgrammeCurriculum(programme_code)
+            for row in modules:
+                credit = float(row.mod_credit_hour or 0)
+                bucket = (row.mod_group, row.mod_type)
+                curriculum.modules[row.module_code] = (credit, bucket)
+                curriculum.bucket_required[bucket] = curriculum.bucket_required.get(bucket, 0.0) + credit
+                curriculum.total_credits += credit
+            self._programmes[programme_code] = curriculum
+
+
+curriculum_index = CurriculumIndex()
+
+
+class DegreeAuditService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.result_service = ResultService(db)
+
+    async def audit_student(self, student_id: str) -> dict:
+        stmt = select(StudentRecord.programmeCode).where(StudentRecord.student_id == student_id)
+        student = (await self.db.execute(stmt)).first()
+        if student is None:
+            raise HTTPException(status_code=404, detail="Student not found")
+        programme_code = student.programmeCode
+        if programme_code is None:
+            raise HTTPException(status_code=404, detail=f"No programme assigned to student {student_id}")
+
+        curriculum = await self.get_curriculum(programme_code)
+        rows = await self.result_service.fetch_effective_results([student_id])
+        return self.audit(curriculum, student_id, rows)
+
+    async def audit_batch(self, batch_name: int, section_name: str = None) -> list:
+        """Audit a whole batch with one student query and one effective-results query"""
+        cohort = select(StudentRecord.student_id).where(StudentRecord.batchName == batch_name)
+        if section_name:
+            cohort = cohort.where(StudentRecord.sectionName == section_name)
+
+        stmt = (select(StudentRecord.student_id, StudentRecord.programmeCode)
+            .where(StudentRecord.student_id.in_(cohort))
+            .order_by(StudentRecord.student_id.asc())
+        )
+        students = (await self.db.execute(stmt)).all()
+        if not students:
+            raise HTTPException(status_code=404, detail=f"No students found for batch {batch_name}")
+
+        rows = await self.result_service.fetch_effective_results(cohort)
+        rows_by_student = {
+            student_id: list(student_rows)
+            for student_id, student_rows in groupby(rows, key=lambda row: row.student_id)
+        }
+
+        # A student without a programme or curriculum is reported, not allowed to fail the batch
+        audits = []
+        for student_id, programme_code in students:
+            curriculum = await curriculum_index.get(self.db, programme_code) if programme_code else None
+            if curriculum is None:
+                audits.append(self.unaudited(student_id, programme_code))
+                continue
+            audits.append(self.audit(curriculum, student_id, rows_by_student.get(student_id, [])))
+        return audits
+
+    async def get_curriculum(self, programme_code: str) -> ProgrammeCurriculum:
+        curriculum = await curriculum_index.get(self.db, programme_code)
+        if curriculum is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No curriculum found for programme {programme_code}"
+            )
+        return curriculum
+
+    def unaudited(self, student_id: str, programme_code: str) -> dict:
+        return {
+            "student_id": student_id,
+            "programme_code": programme_code,
+            "buckets": [],
+            "pending_modules": [],
+            "cleared": False,
+            "error": (
+                f"No curriculum found for programme {programme_code}"
+                if programme_code else "No programme assigned"
+            ),
+        }
+
+    def audit(self, curriculum: ProgrammeCurriculum, student_id: str, rows) -> dict:
+        """Match the student's effective (winning) attempts against the curriculum in one pass"""
+        earned = defaultdict(float)
+        completed = set()
+        extra_credits = 0.0
+
+        for row in rows:
+            if row.grade_point is None or row.grade_point <= 0:
+                continue
+            entry = curriculum.modules.get(row.module_code)
+            if entry is None:
+                extra_credits += float(row.mod_credit_hour or 0)
+                continue
+            if row.module_code in completed:
+                continue
+            credit, bucket = entry
+            completed.add(row.module_code)
+            earned[bucket] += credit
+
+        buckets = []
+        for (mod_group, mod_type), required in curriculum.bucket_required.items():
+            bucket_earned = earned.get((mod_group, mod_type), 0.0)
+            buckets.append({
+                "mod_group": mod_group,
+                "mod_type": mod_type,
+                "required_credits": required,
+                "earned_credits": bucket_earned,
+                "remaining_credits": max(required - bucket_earned, 0.0),
+                "met": bucket_earned >= required,
+            })
+
+        earned_credits = sum(earned.values())
+        remaining = max(curriculum.total_credits - earned_credits, 0.0)
+        return {
+            "student_id": student_id,
+            "programme_code": curriculum.programme_code,
+            "required_credits": curriculum.total_credits,
+            "earned_credits": earned_credits,
+            "remaining_credits": remaining,
+            "completion_percent": round(100 * earned_credits / curriculum.total_credits, 2) if curriculum.total_credits else None,
+            "extra_credits": extra_credits,
+            "buckets": buckets,
+            "pending_modules": [code for code in curriculum.modules if code not in completed],
+            "cleared": remaining == 0 and all(bucket["met"] for bucket in buckets),
+        }
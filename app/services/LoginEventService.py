@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+from sqlalchemy import insert, update
+
+from app.core.batch_writer import BatchWriter
+from app.core.config import settings
+from app.db.session import async_session
+from app.models import LoginEvent, User
+
+# usr_lastLoginIP is String(20): long enough for IPv4 but not most IPv6
+# addresses, which are only kept on the event row
+LAST_LOGIN_IP_LENGTH = 20
+
+
+async def write_login_events(events):
+    """
+    One transaction per batch: a multi-row INSERT into the event table and
+    one last-login UPDATE per student (their latest successful login only).
+    """
+    latest = {}
+    for event in events:
+        if event["success"] and event["student_id"]:
+            latest[event["student_id"]] = event
+
+    async with async_session() as session:
+        await session.execute(insert(LoginEvent), events)
+        if latest:
+            await session.execute(update(User), [
+                {
+                    "student_id": student_id,
+                    # occurred_at is naive UTC; .timestamp() alone would read it as local time
+                    "usr_last_login_at": int(event["occurred_at"].replace(tzinfo=timezone.utc).timestamp()),
+                    "usr_last_login_ip": last_login_ip(event["ip"]),
+                }
+                for student_id, event in latest.items()
+            ])
+        await session.commit()
+
+
+def last_login_ip(ip):
+    """The address if it fits usr_lastLoginIP; a truncated address would look valid but be wrong"""
+    if not ip or len(ip) > LAST_LOGIN_IP_LENGTH:
+        return None
+    return ip
+
+
+login_event_writer = BatchWriter(
+    "login-events",
+    write_login_events,
+    batch_size=settings.LOGIN_EVENT_BATCH_SIZE,
+    flush_interval=settings.LOGIN_EVENT_FLUSH_SECONDS,
+    max_queue=settings.LOGIN_EVENT_QUEUE_SIZE,
+)
+
+
+def record_login(student_id: str, login_id: str, ip: str, user_agent: str, success: bool):
+    """Queue a login attempt; never waits on I/O"""
+    login_event_writer.submit({
+        "student_id": student_id,
+        "login_id": login_id,
+        "ip": ip,
+        "user_agent": (user_agent or "")[:255] or None,
+        "success": success,
+        "occurred_at": datetime.utcnow(),
+    })
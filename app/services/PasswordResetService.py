@@ -13,7 +13,9 @@ from email.mime.multipart import MIMEMultipart
 from app.models.user import User as UserModel
 from app.models.password_reset import PasswordResetToken
 from app.schemas.auth import StandardResponse
-from app.core.security import get_password_hash
+from app.core.password_hasher import password_hasher
+from app.core.principal import invalidate_principal
+from app.services.AuditService import record_change
 from app.db.session import get_db
 from sqlalchemy import delete
 
@@ -166,11 +168,14 @@ class PasswordResetService:
         if not user:
             return False
 
-        user.hash_password = get_password_hash(new_password)        
+        user.hash_password = await password_hasher.hash(new_password)        
 
         try:
             db.add(user)
             await db.commit()
+            invalidate_principal(user.login_id)
+            # Reached through an emailed token, so the account itself is the actor
+            await record_change(user.login_id, "password.reset", user.student_id)
             await db.refresh(user)            
             
             return True
@@ -0,0 +1,174 @@
+import asyncio
+import os
+import re
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import Request
+
+from app.core.cache import ByteLRUCache, TTLCache
+from app.core.config import settings
+from app.core.etag import etag_matches
+from app.core.process_pool import render_pool
+
+# Student ids end up in a filesystem path; anything else gets the default photo
+SAFE_STUDENT_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+@dataclass(frozen=True)
+class PhotoFile:
+    path: str
+    size: int
+    mtime: float
+    etag: str
+    last_modified: str
+
+    def headers(self) -> dict:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": self.last_modified,
+            "Cache-Control": settings.PHOTO_CACHE_CONTROL,
+        }
+
+
+def _stat_photo(path: str):
+    """Blocking stat; runs in the default thread pool"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return PhotoFile(
+        path=path,
+        size=stat.st_size,
+        mtime=stat.st_mtime,
+        etag=f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"',
+        last_modified=formatdate(stat.st_mtime, usegmt=True),
+    )
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def variant_path(photo: PhotoFile, size: int) -> str:
+    """
+    <PHOTO_VARIANT_DIR>/<size>/<stem>.<source validator>.jpg, so a replaced
+    original never maps onto an old thumbnail.
+    """
+    stem = os.path.splitext(os.path.basename(photo.path))[0]
+    validator = photo.etag.strip('"')
+    return os.path.join(settings.PHOTO_VARIANT_DIR, str(size), f"{stem}.{validator}.jpg")
+
+
+def render_variant(source: str, target: str, size: int):
+    """Runs in the process pool: downscale to fit size x size, write atomically, drop stale variants"""
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGB")
+        image.thumbnail((size, size), Image.LANCZOS)
+
+        directory = os.path.dirname(target)
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        image.save(tmp_path, "JPEG", quality=85, optimize=True, progressive=True)
+    os.replace(tmp_path, target)
+
+    prefix = os.path.basename(target).split(".", 1)[0] + "."
+    current = os.path.basename(target)
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(".jpg") and name != current:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+
+
+class PhotoStore:
+    """
+    Per-worker photo lookup and hot-bytes cache.
+
+    Resolved paths and their stat results are trusted for
+    PHOTO_LOOKUP_TTL_SECONDS, so a replaced photo is picked up within that
+    window. Bytes are keyed by (path, etag) and can never be served stale.
+    Thumbnails are rendered in the process pool on first request and served
+    from PHOTO_VARIANT_DIR afterwards.
+    """
+
+    # In-flight renders keyed by variant path, so concurrent requests for the
+    # same thumbnail share one render
+    _pending = {}
+
+    def __init__(self):
+        self._lookups = TTLCache(settings.PHOTO_LOOKUP_CACHE_SIZE, settings.PHOTO_LOOKUP_TTL_SECONDS)
+        self._bytes = ByteLRUCache(settings.PHOTO_CACHE_MAX_BYTES)
+
+    async def lookup(self, student_id: str, size: int = None) -> PhotoFile:
+        key = (student_id, size)
+        photo = self._lookups.get(key)
+        if photo is not None:
+            return photo
+
+        photo = None
+        if SAFE_STUDENT_ID.match(student_id):
+            path = os.path.join(settings.PHOTO_DIRECTORY, f"{student_id}.jpg")
+            photo = await asyncio.to_thread(_stat_photo, path)
+        if photo is None:
+            photo = await asyncio.to_thread(_stat_photo, settings.DEFAULT_PHOTO)
+        if photo is not None and size is not None:
+            photo = await self.variant(photo, size)
+        if photo is not None:
+            self._lookups.set(key, photo)
+        return photo
+
+    async def variant(self, photo: PhotoFile, size: int) -> PhotoFile:
+        path = variant_path(photo, size)
+        variant = await asyncio.to_thread(_stat_photo, path)
+        if variant is not None:
+            return variant
+
+        pending = self._pending.get(path)
+        if pending is None:
+            pending = asyncio.ensure_future(render_pool.run(render_variant, photo.path, path, size))
+            self._pending[path] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(path, None))
+        try:
+            await asyncio.shield(pending)
+        except Exception as e:
+            # Unreadable source image: fall back to the original file
+            print(f"❌ Thumbnail for {photo.path} failed: {e}")
+            return photo
+        return await asyncio.to_thread(_stat_photo, path) or photo
+
+    async def read(self, photo: PhotoFile):
+        """Photo bytes, or None when the file is too large to keep in memory"""
+        if photo.size > settings.PHOTO_CACHE_MAX_ITEM_BYTES:
+            return None
+        key = (photo.path, photo.etag)
+        content = self._bytes.get(key)
+        if content is None:
+            content = await asyncio.to_thread(_read_file, photo.path)
+            self._bytes.set(key, content)
+        return content
+
+    def stats(self) -> dict:
+        return {"lookups": self._lookups.stats(), "bytes": self._bytes.stats()}
+
+
+def photo_not_modified(request: Request, photo: PhotoFile) -> bool:
+    """If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2)"""
+    if request.headers.get("if-none-match"):
+        return etag_matches(request, photo.etag)
+
+    since = request.headers.get("if-modified-since")
+    if not since:
+        return False
+    try:
+        since_ts = parsedate_to_datetime(since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(photo.mtime) <= since_ts
+
+
+photo_store = PhotoStore()
@@ -1,94 +1,460 @@
 from decimal import Decimal
 from datetime import datetime
+import csv
+import io
+import json
+from functools import lru_cache
+from itertools import groupby
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.sql import func
 from fastapi import HTTPException, status
 from pydantic import ValidationError
 
+from app.core.config import settings
+from app.core.etag import make_etag
+from app.core.responses import decimal_str, json_default
+from app.db.session import async_session
 from app.models import (
-    ResultFinalExam
+    ResultFinalExam, ResultSnapshot, StudentRecord
 )
-from app.schemas.result_final_exam import ResultFinalExamSchema, FormatedResultSchema
+from app.schemas.result_final_exam import ResultFinalExamSchema, FormatedResultSchema, ResultSummarySchema
+
+
+# --------------------
+# Column projection + precompiled row mapper
+# --------------------
+# Only these columns are selected, so queries return lightweight Row tuples
+# instead of identity-mapped ORM entities. The order must match map_result_row.
+RESULT_COLUMN_KEYS = (
+    "student_id", "offered_module_id", "module_code", "mod_name", "mod_group",
+    "per_name", "letter_grade", "grade_point", "exm_exam_term", "exm_exam_year",
+    "exm_type", "batch_name", "section_name", "tra_term", "tra_year",
+    "reg_status", "emr_date", "check_grade_point", "mod_credit_hour",
+    "real_gradepoint", "faculty_id", "mod_type",
+)
+
+
+@lru_cache(maxsize=None)
+def result_columns(model) -> tuple:
+    return tuple(getattr(model, key) for key in RESULT_COLUMN_KEYS)
+
+
+RESULT_COLUMNS = result_columns(ResultFinalExam)
+
+
+def result_model():
+    """Where result reads go: the ERP view, or the local snapshot table"""
+    if settings.RESULT_READ_SOURCE == "snapshot":
+        return ResultSnapshot
+    return ResultFinalExam
+
+TERM_LABELS = {1: 'Spring', 2: 'Summer', 3: 'Autumn'}
+EXAM_TYPE_LABELS = {1: 'final', 2: 'supple', 3: 'special supple'}
+BATCH_SUFFIXES = ["th", "st", "nd", "rd", "th", "th", "th", "th", "th", "th"]
+
+
+@lru_cache(maxsize=1024)
+def batch_label(batch) -> str:
+    if batch is None:
+        return None
+    # Special case for 11, 12, 13
+    if 11 <= (batch % 100) <= 13:
+        return f"{batch}th"
+    return f"{batch}{BATCH_SUFFIXES[batch % 10]}"
+
+
+def _to_float(value):
+    return None if value is None else float(value)
+
+
+@lru_cache(maxsize=4096)
+def _to_decimal_str(value):
+    """Numeric column as FormatedResultSchema's Optional[Decimal] (float first, as prepare_result always did)"""
+    return None if value is None else decimal_str(float(value))
+
+
+def result_row_mapper(numeric, wire: bool):
+    """
+    Row tuple (in RESULT_COLUMNS order) -> formatted result dict, with the
+    numeric columns shaped by `numeric`. The wire mapper also emits every
+    FormatedResultSchema key, so its output is byte-for-byte what the
+    response_model produced.
+    """
+    def map_row(row) -> dict:
+        (_, offered_module_id, module_code, mod_name, mod_group, per_name,
+         letter_grade, grade_point, exm_exam_term, exm_exam_year, exm_type,
+         batch_name, section_name, tra_term, tra_year, reg_status, emr_date,
+         check_grade_point, mod_credit_hour, real_gradepoint, faculty_id,
+         mod_type) = row
+        result = {
+            "offered_module_id": offered_module_id,
+            "module_code": module_code,
+            "mod_name": mod_name,
+            "mod_group": mod_group,
+            "per_name": per_name,
+            "letter_grade": letter_grade,
+            "grade_point": numeric(grade_point),
+            "exm_exam_term": TERM_LABELS.get(exm_exam_term, 'Not Specified'),
+            "exm_exam_year": exm_exam_year,
+            "exm_type": EXAM_TYPE_LABELS.get(exm_type),
+            "batch_name": batch_label(batch_name),
+            "section_name": section_name,
+            "tra_term": TERM_LABELS.get(tra_term, 'Not Specified'),
+            "tra_year": tra_year,
+            "reg_status": reg_status,
+            "emr_date": emr_date,
+            "check_grade_point": numeric(check_grade_point),
+            "mod_credit_hour": numeric(mod_credit_hour),
+            "real_gradepoint": numeric(real_gradepoint),
+            "faculty_id": faculty_id,
+            "mod_type": mod_type,
+        }
+        if wire:
+            result["superseded"] = None
+        return result
+    return map_row
+
+
+# Numbers as floats, for server-side use (transcripts, exports)
+map_result_row = result_row_mapper(_to_float, wire=False)
+
+# FormatedResultSchema wire format, for responses that skip validation
+map_result_response = result_row_mapper(_to_decimal_str, wire=True)
+
+
+def _term_label(term):
+    return TERM_LABELS.get(term, 'Not Specified')
+
+
+# Formatted result keys (everything map_result_row returns) and how each raw
+# column value is shaped on the wire; columns without an entry pass through unchanged
+RESULT_FIELDS = RESULT_COLUMN_KEYS[1:]
+RESULT_FORMATTERS = {
+    "grade_point": _to_decimal_str,
+    "exm_exam_term": _term_label,
+    "exm_type": EXAM_TYPE_LABELS.get,
+    "batch_name": batch_label,
+    "tra_term": _term_label,
+    "check_grade_point": _to_decimal_str,
+    "mod_credit_hour": _to_decimal_str,
+    "real_gradepoint": _to_decimal_str,
+}
+
+
+@lru_cache(maxsize=256)
+def sparse_result_mapper(fields: tuple):
+    """Row tuple (in `fields` order) -> formatted dict with only those keys"""
+    formatters = tuple((key, RESULT_FORMATTERS.get(key)) for key in fields)
+
+    def map_row(row) -> dict:
+        return {
+            key: value if formatter is None else formatter(value)
+            for (key, formatter), value in zip(formatters, row)
+        }
+    return map_row
+
 
 class ResultService:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.model = result_model()
+        self.columns = result_columns(self.model)
+
+    async def generate_result(self, student_id:str, fields: tuple = None) -> FormatedResultSchema:
+        """`fields` (from parse_fields over RESULT_FIELDS) narrows both the SELECT and the output"""
+        if fields is not None:
+            results = await self.fetch_results(student_id, columns=self.field_columns(fields))
+            return [sparse_result_mapper(fields)(row) for row in results]
+        results = await self.fetch_results(student_id)
+        formated_result = self.prepare_result(results)
+        return formated_result
+
+    async def generate_effective_result(self, student_id: str, include_superseded: bool = False,
+                                        fields: tuple = None):
+        """
+        Formatted results with retakes/supples resolved in SQL: only the winning
+        attempt per module, or every attempt flagged `superseded` when requested.
+        """
+        rows = await self.fetch_effective_results([student_id], include_superseded, fields)
+        if not rows:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No results found for student ID {student_id}"
+            )
+        return self.prepare_ranked_result(rows, fields)
+
+    async def generate_results_batch(self, student_ids) -> dict:
+        """
+        Formatted results for many students, keyed by student ID.
+        Each chunk of IDs is one IN query whose ordered rows are grouped in a
+        single streaming pass; students without results map to an empty list.
+        """
+        unique_ids = list(dict.fromkeys(student_ids))
+        grouped = {student_id: [] for student_id in unique_ids}
+
+        chunk_size = settings.RESULT_BATCH_CHUNK_SIZE
+        for start in range(0, len(unique_ids), chunk_size):
+            rows = await self.fetch_cohort_results(unique_ids[start:start + chunk_size])
+            for student_id, student_rows in groupby(rows, key=lambda row: row.student_id):
+                grouped[student_id] = [map_result_response(row) for row in student_rows]
 
-    async def generate_result(self, student_id:str) -> FormatedResultSchema:
-        #stmt = select(ResultFinalExam).where(ResultFinalExam.student_id == student_id)
-        stmt = (select(ResultFinalExam)
-            .where(ResultFinalExam.student_id == student_id)
+        return grouped
+
+    async def generate_summary(self, student_id: str) -> ResultSummarySchema:
+        results = await self.fetch_results(student_id)
+        summary = self.calculate_gpa_summary(results)
+        summary["student_id"] = student_id
+        return summary
+
+    def field_columns(self, fields: tuple) -> tuple:
+        return tuple(getattr(self.model, key) for key in fields)
+
+    async def fetch_results(self, student_id: str, columns: tuple = None):
+        #stmt = select(ResultFinalExam).where(self.model.student_id == student_id)
+        stmt = (select(*(columns or self.columns))
+            .where(self.model.student_id == student_id)
             .order_by(
-                ResultFinalExam.exm_exam_year.asc(),
-                ResultFinalExam.exm_exam_term.asc(),
+                self.model.exm_exam_year.asc(),
+                self.model.exm_exam_term.asc(),
             )
         )
         result = await self.db.execute(stmt)
-        results = result.scalars().all()
+        results = result.all()
 
         if not results:
             raise HTTPException(
                 status_code=404,
                 detail=f"No results found for student ID {student_id}"
             )
-        formated_result = self.prepare_result(results)
-        return formated_result
+        return results
+
+    async def result_etag(self, student_id: str, *variant) -> str:
+        """Validator from row count and latest emr_date; no result rows are fetched"""
+        stmt = (select(func.count(), func.max(self.model.emr_date))
+            .where(self.model.student_id == student_id)
+        )
+        count, latest = (await self.db.execute(stmt)).one()
+        return make_etag("result", student_id, count, latest, *variant)
+
+    async def fetch_cohort_results(self, student_ids):
+        """
+        Result rows for many students in one set-based query, ordered by
+        student, year and term so callers can group them in a single pass.
+        `student_ids` may be a list or a scalar subquery.
+        """
+        stmt = (select(*self.columns)
+            .where(self.model.student_id.in_(student_ids))
+            .order_by(
+                self.model.student_id.asc(),
+                self.model.exm_exam_year.asc(),
+                self.model.exm_exam_term.asc(),
+            )
+        )
+        result = await self.db.execute(stmt)
+        return result.all()
     
+    async def fetch_term_results(self, batch_name: int, section_name: str, exam_year: int, exam_term: int):
+        """One section's results for a single exam term, ordered by student and module"""
+        stmt = (select(*self.columns)
+            .where(
+                self.model.batch_name == batch_name,
+                self.model.section_name == section_name,
+                self.model.exm_exam_year == exam_year,
+                self.model.exm_exam_term == exam_term,
+            )
+            .order_by(
+                self.model.student_id.asc(),
+                self.model.module_code.asc(),
+            )
+        )
+        result = await self.db.execute(stmt)
+        return result.all()
+
+    async def fetch_effective_results(self, student_ids, include_superseded: bool = False,
+                                      fields: tuple = None):
+        """
+        Attempts ranked per (student, module) with ROW_NUMBER(): highest grade
+        point first, then the earliest exam type (final < supple < special
+        supple). Rank 1 is the effective attempt; the rest are superseded.
+        `student_ids` may be a list or a scalar subquery; `fields` narrows the
+        outer SELECT (the ranking itself always sees every column it needs).
+        """
+        attempt_rank = func.row_number().over(
+            partition_by=(self.model.student_id, self.model.module_code),
+            order_by=(self.model.grade_point.desc().nulls_last(), self.model.exm_type.asc()),
+        ).label("attempt_rank")
+        ranked = (select(*self.columns, attempt_rank)
+            .where(self.model.student_id.in_(student_ids))
+            .subquery("ranked")
+        )
+
+        stmt = select(
+            *(ranked.c[key] for key in (fields or RESULT_COLUMN_KEYS)),
+            (ranked.c.attempt_rank > 1).label("superseded"),
+        )
+        if not include_superseded:
+            stmt = stmt.where(ranked.c.attempt_rank == 1)
+        stmt = stmt.order_by(
+            ranked.c.student_id.asc(),
+            ranked.c.exm_exam_year.asc(),
+            ranked.c.exm_exam_term.asc(),
+        )
+        result = await self.db.execute(stmt)
+        return result.all()
+
+    def export_statement(self, exam_year: int, exam_term: int = None, programme_code: str = None):
+        """A term's results across all students, ordered for a stable export"""
+        stmt = select(*self.columns).where(self.model.exm_exam_year == exam_year)
+        if exam_term is not None:
+            stmt = stmt.where(self.model.exm_exam_term == exam_term)
+        if programme_code:
+            stmt = stmt.where(self.model.student_id.in_(
+                select(StudentRecord.student_id).where(StudentRecord.programmeCode == programme_code)
+            ))
+        return stmt.order_by(self.model.student_id.asc(), self.model.module_code.asc())
+
     def prepare_result(self, results):
+        return [map_result_response(row) for row in results]
+
+    def prepare_ranked_result(self, results, fields: tuple = None):
+        """Rows from fetch_effective_results: RESULT_COLUMNS (or `fields`) followed by `superseded`"""
+        map_row = map_result_response if fields is None else sparse_result_mapper(fields)
         results_list = []
-        for val in results:
-            result_dict = {
-                "offered_module_id": val.offered_module_id,
-                "module_code": val.module_code,
-                "mod_name": val.mod_name,
-                "mod_group": val.mod_group,
-                "per_name": val.per_name,
-                "letter_grade": val.letter_grade,
-                "grade_point": float(val.grade_point) if val.grade_point is not None else None,
-                "exm_exam_term": self.determine_term(val.exm_exam_term),
-                "exm_exam_year": val.exm_exam_year,
-                "exm_type": self.determine_exam_type(val.exm_type),
-                "batch_name": str(val.batch_name) + self.get_batch_name_suffix(val.batch_name),
-                "section_name": val.section_name,
-                "tra_term": self.determine_term(val.tra_term),
-                "tra_year": val.tra_year,
-                "reg_status": val.reg_status,
-                "emr_date": val.emr_date,
-                "check_grade_point": float(val.check_grade_point) if val.check_grade_point is not None else None,
-                "mod_credit_hour": float(val.mod_credit_hour) if val.mod_credit_hour is not None else None,
-                "real_gradepoint": float(val.real_gradepoint) if val.real_gradepoint is not None else None,
-                "faculty_id": val.faculty_id,
-                "mod_type": val.mod_type
-            }
+        for row in results:
+            result_dict = map_row(row[:-1])
+            result_dict["superseded"] = row[-1]
             results_list.append(result_dict)
-
         return results_list
 
+    # --------------------
+    # GPA engine
+    # --------------------
+    def calculate_gpa_summary(self, results):
+        """
+        Per-term SGPA and running CGPA in a single pass over rows ordered by
+        (exm_exam_year, exm_exam_term).
+
+        SGPA only counts the regular (final) attempts sat in that term. For the
+        CGPA every module counts once: a supple / special supple attempt
+        replaces the earlier attempt when it scores higher, and the running
+        totals are adjusted in place instead of being recomputed.
+        """
+        terms = []
+        effective = {}  # module_code -> (grade_point, credit)
+        cum_points = 0.0
+        cum_credits = 0.0
+        cum_earned = 0.0
+        current_key = None
+        term = None
+
+        for val in results:
+            if val.grade_point is None or not val.mod_credit_hour:
+                continue
+            grade_point = float(val.grade_point)
+            credit = float(val.mod_credit_hour)
+
+            key = (val.exm_exam_year, val.exm_exam_term)
+            if key != current_key:
+                if term is not None:
+                    terms.append(self._close_term(term, cum_points, cum_credits))
+                current_key = key
+                term = {
+                    "exm_exam_year": val.exm_exam_year,
+                    "exm_exam_term": self.determine_term(val.exm_exam_term),
+                    "points": 0.0,
+                    "credits_attempted": 0.0,
+                    "credits_earned": 0.0,
+                    "supple_credits": 0.0,
+                }
+
+            if val.exm_type in (2, 3):
+                term["supple_credits"] += credit
+            else:
+                term["points"] += grade_point * credit
+                term["credits_attempted"] += credit
+                if grade_point > 0:
+                    term["credits_earned"] += credit
+
+            previous = effective.get(val.module_code)
+            if previous is None:
+                effective[val.module_code] = (grade_point, credit)
+                cum_points += grade_point * credit
+                cum_credits += credit
+                if grade_point > 0:
+                    cum_earned += credit
+            elif grade_point > previous[0]:
+                old_point, old_credit = previous
+                effective[val.module_code] = (grade_point, credit)
+                cum_points += grade_point * credit - old_point * old_credit
+                cum_credits += credit - old_credit
+                cum_earned += credit - (old_credit if old_point > 0 else 0.0)
+
+        if term is not None:
+            terms.append(self._close_term(term, cum_points, cum_credits))
+
+        return {
+            "terms": terms,
+            "credits_attempted": cum_credits,
+            "credits_earned": cum_earned,
+            "cgpa": self._gpa(cum_points, cum_credits),
+        }
+
+    def _close_term(self, term, cum_points, cum_credits):
+        points = term.pop("points")
+        term["sgpa"] = self._gpa(points, term["credits_attempted"])
+        term["cgpa"] = self._gpa(cum_points, cum_credits)
+        return term
+
+    def _gpa(self, points, credits):
+        if not credits:
+            return None
+        return round(points / credits, 2)
+
 
     def determine_term(self, term):
-        if term ==1:
-            return 'Spring'
-        elif term ==2:
-            return 'Summer'
-        elif term == 3:
-            return 'Autumn'
-        else: 
-            return 'Not Specified'
-    
+        return TERM_LABELS.get(term, 'Not Specified')
+
     def determine_exam_type(self, type):
-        if type == 1:
-            return 'final'
-        elif type == 2:
-            return 'supple'
-        elif type == 3:
-            return 'special supple'      
-    
-    def get_batch_name_suffix(self, batch: int) -> str:
-        ends = ["th", "st", "nd", "rd", "th", "th", "th", "th", "th", "th"]
+        return EXAM_TYPE_LABELS.get(type)
 
-        # Special case for 11, 12, 13
+    def get_batch_name_suffix(self, batch: int) -> str:
         if 11 <= (batch % 100) <= 13:
             return "th"
+        return BATCH_SUFFIXES[batch % 10]
+
+
+# --------------------
+# Streaming export
+# --------------------
+async def export_results(exam_year: int, exam_term: int = None, programme_code: str = None, output: str = "ndjson"):
+    """
+    Yield a term's results as NDJSON lines or CSV text.
+
+    Rows are read through a server-side cursor in EXPORT_CHUNK_SIZE batches on
+    a session owned by the generator (the request session is closed before a
+    streaming body is sent), so memory stays flat regardless of term size.
+    """
+    async with async_session() as session:
+        service = ResultService(session)
+        stmt = service.export_statement(exam_year, exam_term, programme_code)
+        stream = await session.stream(stmt.execution_options(yield_per=settings.EXPORT_CHUNK_SIZE))
+
+        if output == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(RESULT_COLUMN_KEYS)
+            async for partition in stream.partitions():
+                for row in partition:
+                    record = map_result_row(row)
+                    writer.writerow([row.student_id] + list(record.values()))
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+            yield buffer.getvalue()
         else:
-            return ends[batch % 10]
+            async for partition in stream.partitions():
+                yield "".join(
+                    json.dumps({"student_id": row.student_id, **map_result_row(row)}, default=json_default) + "\n"
+                    for row in partition
+                )
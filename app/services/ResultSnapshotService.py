@@ -0,0 +1,75 @@
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+
+from app.core.config import settings
+from app.db.refresh import begin_refresh, finish_refresh, rows_per_statement, since_watermark, upsert
+from app.db.session import async_session
+from app.models import RefreshWatermark, ResultFinalExam, ResultSnapshot
+
+WATERMARK_NAME = "result_snapshot"
+
+# pg_try_advisory_xact_lock key so only one worker refreshes at a time
+REFRESH_LOCK_KEY = 7_301_002
+
+# Rows fetched from the view cursor and upserted per round trip
+REFRESH_CHUNK_SIZE = rows_per_statement(ResultSnapshot.__table__)
+
+
+class ResultSnapshotService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def refresh(self) -> int:
+        """
+        Copy view rows whose emr_date is at or after the watermark into the
+        snapshot table. The first run (no watermark) copies the whole view.
+        Returns the number of rows upserted (-1 if another worker holds the lock).
+        """
+        mark = await begin_refresh(self.db, REFRESH_LOCK_KEY, WATERMARK_NAME)
+        if mark is None:
+            return -1
+
+        view = ResultFinalExam.__table__
+        stmt = since_watermark(select(view), view.c.emr_date, mark.watermark)
+
+        table = ResultSnapshot.__table__
+        upserted = 0
+        latest = mark.watermark
+
+        # Read the view through a server-side cursor on its own connection
+        async with async_session() as reader:
+            stream = await reader.stream(stmt.execution_options(yield_per=REFRESH_CHUNK_SIZE))
+            async for partition in stream.partitions():
+                rows = [dict(row._mapping) for row in partition]
+                for row in rows:
+                    if row["emr_date"] is not None and (latest is None or row["emr_date"] > latest):
+                        latest = row["emr_date"]
+
+                await self.db.execute(upsert(table, rows))
+                upserted += len(rows)
+
+        finish_refresh(mark, latest, upserted)
+        await self.db.commit()
+        return upserted
+
+    async def status(self) -> dict:
+        mark = await self.db.get(RefreshWatermark, WATERMARK_NAME)
+        snapshot_rows = await self.db.scalar(select(func.count()).select_from(ResultSnapshot.__table__))
+
+        refreshed_at = mark.refreshed_at if mark else None
+        return {
+            "read_source": settings.RESULT_READ_SOURCE,
+            "watermark": mark.watermark if mark else None,
+            "refreshed_at": refreshed_at,
+            "rows_last_refresh": mark.rows_refreshed if mark else 0,
+            "snapshot_rows": snapshot_rows,
+            "lag_seconds": (datetime.utcnow() - refreshed_at).total_seconds() if refreshed_at else None,
+        }
+
+
+async def refresh_result_snapshot():
+    """Entry point for the background refresher"""
+    async with async_session() as session:
+        await ResultSnapshotService(session).refresh()
@@ -0,0 +1,330 @@
+import asyncio
+import heapq
+import re
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.refresh import since_watermark
+from app.db.session import async_session
+from app.models import StudentRecord
+
+SEARCH_COLUMNS = (
+    StudentRecord.student_id,
+    StudentRecord.per_name,
+    StudentRecord.per_mobile,
+    StudentRecord.batchName,
+    StudentRecord.pro_shortName,
+    StudentRecord.programmeCode,
+    StudentRecord.adm_date,
+)
+SEARCH_KEYS = tuple(column.key for column in SEARCH_COLUMNS)
+
+NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+# Upper bound on sorted-key entries walked per prefix, so one-letter queries stay cheap
+MAX_PREFIX_SCAN = 5000
+
+EMPTY_POSTING = array("I")
+
+# Share of the query's trigrams a row must contain to count as a fuzzy hit
+MIN_TRIGRAM_SHARE = 0.5
+
+
+def fold(text) -> str:
+    """Lowercase, accent-free text with every non-alphanumeric run collapsed to one space"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii")
+    return NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def compact(text) -> str:
+    """IDs and phone numbers without separators: '222-115-001' -> '222115001'"""
+    return fold(text).replace(" ", "")
+
+
+def trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def code_terms(student_id, mobile):
+    keys = {compact(student_id)}
+    phone = compact(mobile)
+    if phone:
+        keys.add(phone)
+        # +8801712... is typed as 01712...
+        if phone.startswith("880"):
+            keys.add(phone[2:])
+    keys.discard("")
+    return keys
+
+
+class StudentSearchIndex:
+    """
+    Per-worker search index over vw_student_info (student ID, name, mobile).
+
+    Rows live in append-only slots. An update appends a new slot and
+    tombstones the old one, so posting lists stay sorted and are never
+    rewritten in place; the periodic full rebuild compacts them.
+
+    - code_keys / word_keys: sorted (key, slot) lists for bisect prefix
+      lookups over compacted IDs and phone numbers, and over name words
+    - code_grams: trigram -> array of slots, for digits typed from the
+      middle of an ID or phone number
+    - word_grams: trigram -> name words, for typo-tolerant name matches.
+      Names repeat heavily, so fuzzy matching runs over the word vocabulary
+      and only the matched words are expanded to rows.
+    """
+
+    def __init__(self):
+        self.rows = []
+        self.names = []
+        self.slots = {}
+        self.code_keys = []
+        self.word_keys = []
+        self.code_grams = {}
+        self.word_grams = {}
+        self.vocabulary = set()
+        self.watermark = None
+        self.built_at = 0.0
+
+    # --------------------
+    # Building
+    # --------------------
+    @classmethod
+    def build(cls, rows) -> "StudentSearchIndex":
+        index = cls()
+        code_keys, word_keys = [], []
+        for row in rows:
+            index._append(row, code_keys, word_keys)
+        code_keys.sort()
+        word_keys.sort()
+        index.code_keys = code_keys
+        index.word_keys = word_keys
+        index.built_at = time.monotonic()
+        return index
+
+    def upsert(self, rows) -> int:
+        """Apply rows from an incremental refresh; unchanged rows are skipped"""
+        new_codes, new_words = [], []
+        changed = 0
+        for row in rows:
+            slot = self.slots.get(row[0])
+            if slot is not None:
+                if self.rows[slot] == row:
+                    continue
+                self.rows[slot] = None
+            self._append(row, new_codes, new_words)
+            changed += 1
+        for entry in new_codes:
+            insort(self.code_keys, entry)
+        for entry in new_words:
+            insort(self.word_keys, entry)
+        return changed
+
+    def _append(self, row, code_keys, word_keys):
+        slot = len(self.rows)
+        self.rows.append(row)
+        self.slots[row[0]] = slot
+
+        codes = code_terms(row[0], row[2])
+        grams = set()
+        for key in codes:
+            code_keys.append((key, slot))
+            grams |= trigrams(key)
+        for gram in grams:
+            posting = self.code_grams.get(gram)
+            if posting is None:
+                posting = self.code_grams[gram] = array("I")
+            posting.append(slot)
+
+        words = tuple(fold(row[1]).split())
+        self.names.append(words)
+        for word in set(words):
+            word_keys.append((word, slot))
+            if word not in self.vocabulary:
+                self.vocabulary.add(word)
+                for gram in trigrams(f" {word} "):
+                    self.word_grams.setdefault(gram, []).append(word)
+
+        adm_date = row[-1]
+        if adm_date is not None and (self.watermark is None or adm_date > self.watermark):
+            self.watermark = adm_date
+
+    # --------------------
+    # Lookup
+    # --------------------
+    def search(self, query: str, limit: int = 20) -> list:
+        terms = fold(query).split()
+        code = compact(query)
+        if not code:
+            return []
+
+        # Exact student ID, then prefix hits in key order, then fuzzy hits by trigram overlap
+        ranked = {}
+        exact = self.slots.get(query.strip())
+        if exact is not None and self.rows[exact] is not None:
+            ranked[exact] = 3.0
+
+        for slot in self._prefix(self.code_keys, code):
+            if len(ranked) >= limit:
+                break
+            ranked.setdefault(slot, 2.0)
+
+        if terms and len(ranked) < limit:
+            for slot in self._prefix(self.word_keys, terms[0]):
+                if len(ranked) >= limit:
+                    break
+                if self._name_score(slot, terms[1:]) == 1.0:
+                    ranked.setdefault(slot, 2.0)
+
+        if len(ranked) < limit and len(code) >= 3:
+            if any(c.isalpha() for c in code):
+                self._fuzzy_names(terms, ranked, limit)
+            elif not ranked:
+                # Digit postings are long, so only when nothing matched as a prefix
+                self._fuzzy_codes(code, ranked, limit)
+
+        hits = sorted(ranked.items(), key=lambda hit: -hit[1])[:limit]
+        return [dict(zip(SEARCH_KEYS, self.rows[slot]), score=round(score, 3)) for slot, score in hits]
+
+    def _prefix(self, keys, prefix: str, exact: bool = False):
+        """Live slots whose key starts with (or equals) prefix, in key order"""
+        start = bisect_left(keys, (prefix,))
+        for key, slot in keys[start:start + MAX_PREFIX_SCAN]:
+            if not key.startswith(prefix) or (exact and key != prefix):
+                break
+            if self.rows[slot] is not None:
+                yield slot
+
+    def _name_score(self, slot, terms, fuzzy=None) -> float:
+        """Mean per-term score: 1 when a name word starts with the term, else its best fuzzy match"""
+        if not terms:
+            return 1.0
+        words = self.names[slot]
+        total = 0.0
+        for i, term in enumerate(terms):
+            if any(word.startswith(term) for word in words):
+                total += 1.0
+            elif fuzzy is not None and fuzzy[i]:
+                total += max((fuzzy[i].get(word, 0.0) for word in words), default=0.0)
+        return total / len(terms)
+
+    def _fuzzy_words(self, term: str) -> dict:
+        """Vocabulary words sharing at least MIN_TRIGRAM_SHARE of the term's trigrams"""
+        grams = trigrams(f" {term} ")
+        if not grams:
+            return {}
+        counts = Counter()
+        for gram in grams:
+            counts.update(self.word_grams.get(gram, ()))
+        needed = max(1, int(len(grams) * MIN_TRIGRAM_SHARE + 0.5))
+        return {word: shared / len(grams) for word, shared in counts.items() if shared >= needed}
+
+    def _fuzzy_names(self, terms, ranked, limit):
+        fuzzy = [self._fuzzy_words(term) for term in terms]
+        if not fuzzy[0]:
+            return
+        for word, score in sorted(fuzzy[0].items(), key=lambda item: -item[1]):
+            for slot in self._prefix(self.word_keys, word, exact=True):
+                if slot in ranked:
+                    continue
+                rest = self._name_score(slot, terms[1:], fuzzy[1:])
+                total = (score + rest * (len(terms) - 1)) / len(terms)
+                if total >= MIN_TRIGRAM_SHARE:
+                    ranked[slot] = total
+                    if len(ranked) >= limit:
+                        return
+
+    def _fuzzy_codes(self, code: str, ranked, limit):
+        """
+        Digits from the middle of an ID or phone number.
+
+        A row sharing `needed` of n trigrams must appear in one of the
+        n - needed + 1 rarest posting lists, so only those are scanned; the
+        remaining grams are probed by bisect for each candidate.
+        """
+        postings = sorted((self.code_grams.get(gram, EMPTY_POSTING) for gram in trigrams(code)), key=len)
+        needed = max(1, int(len(postings) * MIN_TRIGRAM_SHARE + 0.5))
+        scan = len(postings) - needed + 1
+
+        counts = Counter()
+        for posting in postings[:scan]:
+            counts.update(posting)
+
+        hits = {}
+        for slot, shared in counts.items():
+            if self.rows[slot] is None or slot in ranked:
+                continue
+            for k in range(scan, len(postings)):
+                if shared + len(postings) - k < needed:
+                    break
+                posting = postings[k]
+                i = bisect_left(posting, slot)
+                if i < len(posting) and posting[i] == slot:
+                    shared += 1
+            if shared >= needed:
+                hits[slot] = shared / len(postings)
+
+        for slot, score in heapq.nlargest(limit - len(ranked), hits.items(), key=lambda hit: hit[1]):
+            ranked[slot] = score
+
+    def stats(self) -> dict:
+        live = len(self.slots)
+        return {
+            "students": live,
+            "tombstones": len(self.rows) - live,
+            "name_words": len(self.vocabulary),
+            "code_trigrams": len(self.code_grams),
+            "watermark": self.watermark,
+            "age_seconds": round(time.monotonic() - self.built_at, 1) if self.built_at else None,
+        }
+
+
+class StudentSearch:
+    """Owns the current index; refreshes incrementally and rebuilds on a schedule"""
+
+    def __init__(self):
+        self.index = None
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> StudentSearchIndex:
+        if self.index is None:
+            await self.refresh(only_if_missing=True)
+        return self.index
+
+    async def refresh(self, only_if_missing: bool = False):
+        async with self._lock:
+            index = self.index
+            if only_if_missing and index is not None:
+                return
+            rebuild = (
+                index is None
+                or index.watermark is None
+                or time.monotonic() - index.built_at >= settings.SEARCH_REBUILD_SECONDS
+            )
+
+            stmt = select(*SEARCH_COLUMNS)
+            if not rebuild:
+                stmt = since_watermark(stmt, StudentRecord.adm_date, index.watermark)
+            async with async_session() as session:
+                rows = [tuple(row) for row in (await session.execute(stmt)).all()]
+
+            if rebuild:
+                # Build off the event loop, then swap in one assignment
+                self.index = await asyncio.to_thread(StudentSearchIndex.build, rows)
+            else:
+                index.upsert(rows)
+
+
+student_search = StudentSearch()
+
+
+async def refresh_student_search():
+    """Entry point for the background refresher"""
+    await student_search.refresh()
@@ -0,0 +1,197 @@
+import csv
+import io
+import json
+from array import array
+from dataclasses import dataclass
+from operator import mul
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+
+from app.core.responses import json_default
+from app.services.ResultService import ResultService, TERM_LABELS
+
+
+@dataclass
+class TabulationSheet:
+    """
+    Dense students x modules matrix kept in flat row-major arrays:
+    cell (i, j) lives at index i * len(module_codes) + j.
+    """
+    batch_name: int
+    section_name: str
+    exam_year: int
+    exam_term: int
+
+    student_ids: List[str]
+    student_names: List[Optional[str]]
+    module_codes: List[str]
+    module_names: List[Optional[str]]
+    credits: array          # per module
+    points: array           # grade point per cell, 0 when absent
+    weights: array          # credit per cell, 0 when absent
+    present: array          # 1 when the student sat the module
+    letters: list           # letter grade per cell, None when absent
+
+    student_gpa: List[Optional[float]] = None
+    module_average: List[Optional[float]] = None
+
+
+class TabulationService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.result_service = ResultService(db)
+
+    async def build_sheet(self, batch_name: int, section_name: str, exam_year: int, exam_term: int) -> TabulationSheet:
+        rows = await self.result_service.fetch_term_results(batch_name, section_name, exam_year, exam_term)
+        if not rows:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No results found for batch {batch_name} section {section_name}"
+            )
+
+        sheet = self.pivot(rows, batch_name, section_name, exam_year, exam_term)
+        self.compute_aggregates(sheet)
+        return sheet
+
+    def pivot(self, rows, batch_name, section_name, exam_year, exam_term) -> TabulationSheet:
+        student_index = {}
+        student_names = []
+        module_info = {}
+
+        # First pass assigns dense row indices; rows are ordered by student
+        for row in rows:
+            if row.student_id not in student_index:
+                student_index[row.student_id] = len(student_index)
+                student_names.append(row.per_name)
+            if row.module_code not in module_info:
+                module_info[row.module_code] = (row.mod_name, float(row.mod_credit_hour or 0))
+
+        # Columns sorted by module code for a stable sheet layout
+        module_codes = sorted(module_info, key=lambda code: code or "")
+        module_index = {code: j for j, code in enumerate(module_codes)}
+        module_names = [module_info[code][0] for code in module_codes]
+        credits = array('d', (module_info[code][1] for code in module_codes))
+
+        n_students = len(student_index)
+        n_modules = len(module_index)
+        size = n_students * n_modules
+        points = array('d', bytes(8 * size))
+        weights = array('d', bytes(8 * size))
+        present = array('b', bytes(size))
+        letters = [None] * size
+
+        for row in rows:
+            if row.grade_point is None:
+                continue
+            j = module_index[row.module_code]
+            cell = student_index[row.student_id] * n_modules + j
+            grade_point = float(row.grade_point)
+            # A supple sat in the same term replaces the lower attempt
+            if present[cell] and points[cell] >= grade_point:
+                continue
+            points[cell] = grade_point
+            weights[cell] = credits[j]
+            present[cell] = 1
+            letters[cell] = row.letter_grade
+
+        return TabulationSheet(
+            batch_name=batch_name,
+            section_name=section_name,
+            exam_year=exam_year,
+            exam_term=exam_term,
+            student_ids=list(student_index),
+            student_names=student_names,
+            module_codes=module_codes,
+            module_names=module_names,
+            credits=credits,
+            points=points,
+            weights=weights,
+            present=present,
+            letters=letters,
+        )
+
+    def compute_aggregates(self, sheet: TabulationSheet):
+        """Term GPA per student (row slices) and average grade point per module (strided column slices)"""
+        m = len(sheet.module_codes)
+        gpa = []
+        for i in range(len(sheet.student_ids)):
+            row_points = sheet.points[i * m:(i + 1) * m]
+            row_weights = sheet.weights[i * m:(i + 1) * m]
+            total_weight = sum(row_weights)
+            gpa.append(round(sum(map(mul, row_points, row_weights)) / total_weight, 2) if total_weight else None)
+
+        averages = []
+        for j in range(m):
+            sat = sum(sheet.present[j::m])
+            averages.append(round(sum(sheet.points[j::m]) / sat, 2) if sat else None)
+
+        sheet.student_gpa = gpa
+        sheet.module_average = averages
+
+    # --------------------
+    # Streaming output
+    # --------------------
+    def iter_json(self, sheet: TabulationSheet):
+        m = len(sheet.module_codes)
+        header = {
+            "batch_name": sheet.batch_name,
+            "section_name": sheet.section_name,
+            "exam_year": sheet.exam_year,
+            "exam_term": TERM_LABELS.get(sheet.exam_term, 'Not Specified'),
+            "modules": [
+                {"module_code": code, "mod_name": name, "mod_credit_hour": credit, "average_grade_point": average}
+                for code, name, credit, average in zip(
+                    sheet.module_codes, sheet.module_names, sheet.credits, sheet.module_average
+                )
+            ],
+        }
+        yield json.dumps(header, default=json_default)[:-1] + ',"students":['
+
+        for i, student_id in enumerate(sheet.student_ids):
+            start = i * m
+            grades = [
+                {"letter_grade": sheet.letters[cell], "grade_point": sheet.points[cell]}
+                if sheet.present[cell] else None
+                for cell in range(start, start + m)
+            ]
+            item = {
+                "student_id": student_id,
+                "per_name": sheet.student_names[i],
+                "grades": grades,
+                "gpa": sheet.student_gpa[i],
+            }
+            yield ("," if i else "") + json.dumps(item, default=json_default)
+
+        yield "]}"
+
+    def iter_csv(self, sheet: TabulationSheet):
+        m = len(sheet.module_codes)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def flush():
+            data = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            return data
+
+        writer.writerow(["Student ID", "Name"] + sheet.module_codes + ["GPA"])
+        yield flush()
+
+        for i, student_id in enumerate(sheet.student_ids):
+            start = i * m
+            cells = [
+                f"{sheet.letters[cell]} ({sheet.points[cell]:.2f})" if sheet.present[cell] else ""
+                for cell in range(start, start + m)
+            ]
+            gpa = sheet.student_gpa[i]
+            writer.writerow([student_id, sheet.student_names[i]] + cells + ["" if gpa is None else f"{gpa:.2f}"])
+            yield flush()
+
+        writer.writerow(
+            ["", "Average"]
+            + ["" if average is None else f"{average:.2f}" for average in sheet.module_average]
+            + [""]
+        )
+        yield flush()
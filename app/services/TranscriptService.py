@@ -0,0 +1,360 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import re
+import zipfile
+from collections import deque
+from itertools import groupby
+from xml.sax.saxutils import escape
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from fastapi import HTTPException
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from app.core.config import settings
+from app.core.process_pool import render_pool
+from app.models import StudentRecord
+from app.services.ResultService import ResultService, map_result_row
+
+# Bump when the PDF layout changes so cached transcripts are re-rendered
+TRANSCRIPT_LAYOUT_VERSION = 2
+
+STUDENT_FIELDS = (
+    "student_id", "per_name", "per_fathersName", "per_mothersName",
+    "per_dateOfBirth", "pro_officialName", "pro_name", "batchName",
+    "sectionName", "adm_date", "dpt_officalNameforCertificate",
+)
+
+RESULT_FIELDS = (
+    "module_code", "mod_name", "mod_credit_hour", "letter_grade",
+    "grade_point", "exm_exam_year", "exm_exam_term", "exm_type",
+)
+
+SAFE_STUDENT_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class TranscriptService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.result_service = ResultService(db)
+
+    # In-flight renders keyed by cache path, so concurrent downloads of the
+    # same transcript share one render
+    _pending = {}
+
+    async def get_transcript(self, student_id: str) -> str:
+        """
+        Return the path of the rendered transcript PDF, rendering it in the
+        process pool only when the student's result rows have changed.
+        """
+        student = await self.get_student(student_id)
+        results = await self.result_service.fetch_results(student_id)
+        student_data, results_data, summary = self.build_payload(student, results)
+        return await self.render_cached(student_id, student_data, results_data, summary)
+
+    async def get_student(self, student_id: str) -> StudentRecord:
+        stmt = select(StudentRecord).where(StudentRecord.student_id == student_id)
+        result = await self.db.execute(stmt)
+        student = result.scalars().first()
+
+        if not student or not SAFE_STUDENT_ID.match(student_id):
+            raise HTTPException(
+                status_code=404,
+                detail=f"Student {student_id} not found"
+            )
+        return student
+
+    def build_payload(self, student, results):
+        """Plain, picklable data handed to the render process"""
+        student_data = {field: getattr(student, field) for field in STUDENT_FIELDS}
+        results_data = [
+            {field: row[field] for field in RESULT_FIELDS}
+            for row in map(map_result_row, results)
+        ]
+        summary = self.result_service.calculate_gpa_summary(results)
+        return student_data, results_data, summary
+
+    async def render_cached(self, student_id, student_data, results_data, summary) -> str:
+        fingerprint = transcript_fingerprint(student_data, results_data)
+        path = os.path.join(settings.TRANSCRIPT_CACHE_DIR, f"{student_id}-{fingerprint}.pdf")
+
+        loop = asyncio.get_running_loop()
+        if await loop.run_in_executor(None, os.path.exists, path):
+            return path
+
+        pending = self._pending.get(path)
+        if pending is None:
+            pending = asyncio.ensure_future(
+                self._render_to_cache(student_id, path, student_data, results_data, summary)
+            )
+            self._pending[path] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(path, None))
+        await asyncio.shield(pending)
+        return path
+
+    # --------------------
+    # Bulk (batch / section) transcripts
+    # --------------------
+    async def fetch_cohort(self, batch_name: int, section_name: str = None):
+        """
+        Load a whole batch/section with two set-based queries and return the
+        render payload of every student, in student ID order.
+        """
+        cohort = select(StudentRecord.student_id).where(StudentRecord.batchName == batch_name)
+        if section_name:
+            cohort = cohort.where(StudentRecord.sectionName == section_name)
+
+        stmt = (select(StudentRecord)
+            .where(StudentRecord.student_id.in_(cohort))
+            .order_by(StudentRecord.student_id.asc())
+        )
+        result = await self.db.execute(stmt)
+        students = result.scalars().all()
+        if not students:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No students found for batch {batch_name}"
+            )
+
+        results = await self.result_service.fetch_cohort_results(cohort)
+        results_by_student = {
+            student_id: list(rows)
+            for student_id, rows in groupby(results, key=lambda row: row.student_id)
+        }
+
+        payloads = []
+        for student in students:
+            if not SAFE_STUDENT_ID.match(student.student_id):
+                continue
+            rows = results_by_student.get(student.student_id)
+            if rows:
+                payloads.append(self.build_payload(student, rows))
+        return payloads
+
+    async def stream_cohort_zip(self, payloads):
+        """
+        Yield a ZIP archive of the cohort's transcripts chunk by chunk.
+
+        Renders are fanned out to the render pool a few at a time (reusing
+        cached PDFs), and each PDF is written to the archive and released as
+        soon as it is ready, so memory stays bounded by the render window.
+
+        The response is already under way, so one student's failed render
+        must not cut the archive short: that member is skipped and listed
+        in an errors.txt member at the end.
+        """
+        window = max(1, settings.RENDER_POOL_WORKERS * 2)
+        loop = asyncio.get_running_loop()
+        sink = _ZipChunkSink()
+        in_flight = deque()
+        failed = []
+        payloads = iter(payloads)
+
+        def schedule():
+            for payload in payloads:
+                student_id = payload[0]["student_id"]
+                in_flight.append((student_id, asyncio.ensure_future(
+                    self.render_cached(student_id, *payload)
+                )))
+                if len(in_flight) >= window:
+                    break
+
+        # PDFs are already compressed; storing them keeps the event loop free
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            schedule()
+            try:
+                while in_flight:
+                    student_id, task = in_flight.popleft()
+                    try:
+                        path = await task
+                        pdf = await loop.run_in_executor(None, _read_file, path)
+                    except Exception as e:
+                        print(f"❌ Transcript for {student_id} skipped in cohort ZIP: {e!r}")
+                        failed.append(f"{student_id}: {type(e).__name__}: {e}")
+                        schedule()
+                        continue
+                    schedule()
+                    archive.writestr(f"transcript-{student_id}.pdf", pdf)
+                    del pdf
+                    yield sink.drain()
+            finally:
+                for _, task in in_flight:
+                    task.cancel()
+            if failed:
+                archive.writestr("errors.txt", "Transcripts not included:\n" + "\n".join(failed) + "\n")
+        yield sink.drain()
+
+    async def _render_to_cache(self, student_id, path, student_data, results_data, summary):
+        pdf = await render_pool.run(render_transcript_pdf, student_data, results_data, summary)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, store_transcript, student_id, path, pdf)
+
+
+# --------------------
+# Cache helpers
+# --------------------
+def transcript_fingerprint(student_data, results_data) -> str:
+    payload = json.dumps(
+        [TRANSCRIPT_LAYOUT_VERSION, student_data, results_data],
+        default=str,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def store_transcript(student_id: str, path: str, pdf: bytes):
+    """Atomically write the PDF and drop older fingerprints for the student"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(pdf)
+    os.replace(tmp_path, path)
+
+    prefix = f"{student_id}-"
+    current = os.path.basename(path)
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(".pdf") and name != current:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+
+
+class _ZipChunkSink:
+    """Write-only, non-seekable sink for ZipFile that is drained per member"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+# --------------------
+# PDF layout (runs inside the render pool)
+# --------------------
+def _fmt(value, digits=2):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.{digits}f}"
+    return str(value)
+
+
+def render_transcript_pdf(student: dict, results: list, summary: dict) -> bytes:
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        leftMargin=15 * mm,
+        rightMargin=15 * mm,
+        topMargin=15 * mm,
+        bottomMargin=15 * mm,
+        title=f"Transcript {student['student_id']}",
+    )
+    styles = getSampleStyleSheet()
+    story = []
+
+    institution = student.get("dpt_officalNameforCertificate") or "Academic Transcript"
+    # Paragraph text is reportlab markup; ERP values are escaped so a stray "<" cannot break the render
+    story.append(Paragraph(escape(institution), styles["Title"]))
+    story.append(Paragraph("Academic Transcript", styles["Heading2"]))
+
+    info = [
+        ["Student ID", _fmt(student["student_id"]), "Name", _fmt(student["per_name"])],
+        ["Programme", _fmt(student["pro_officialName"] or student["pro_name"]),
+         "Batch / Section", f"{_fmt(student['batchName'])} / {_fmt(student['sectionName'])}"],
+        ["Father's Name", _fmt(student["per_fathersName"]),
+         "Mother's Name", _fmt(student["per_mothersName"])],
+        ["Date of Birth", _fmt(student["per_dateOfBirth"]),
+         "Admission Date", _fmt(student["adm_date"])],
+    ]
+    info_table = Table(info, colWidths=[28 * mm, 62 * mm, 30 * mm, 60 * mm])
+    info_table.setStyle(TableStyle([
+        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+        ("FONTNAME", (2, 0), (2, -1), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ]))
+    story.append(info_table)
+    story.append(Spacer(1, 6 * mm))
+
+    term_summaries = {
+        (term["exm_exam_year"], term["exm_exam_term"]): term
+        for term in summary["terms"]
+    }
+
+    # Rows arrive ordered by (year, term); emit one table per term
+    rows = []
+    current_key = None
+    for result in results + [None]:
+        key = None if result is None else (result["exm_exam_year"], result["exm_exam_term"])
+        if key != current_key and rows:
+            story.extend(_term_block(current_key, rows, term_summaries.get(current_key), styles))
+            rows = []
+        current_key = key
+        if result is not None:
+            rows.append([
+                _fmt(result["module_code"]),
+                Paragraph(escape(_fmt(result["mod_name"])), styles["BodyText"]),
+                _fmt(result["mod_credit_hour"], 1),
+                _fmt(result["letter_grade"]),
+                _fmt(result["grade_point"]),
+                _fmt(result["exm_type"]),
+            ])
+
+    story.append(Spacer(1, 4 * mm))
+    story.append(Paragraph(
+        f"Credits completed: {_fmt(summary['credits_earned'], 1)} &nbsp;&nbsp; "
+        f"CGPA: {_fmt(summary['cgpa'])}",
+        styles["Heading3"],
+    ))
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def _term_block(key, rows, term, styles):
+    year, term_name = key
+    header = ["Code", "Module", "Credit", "Grade", "GP", "Exam"]
+    table = Table([header] + rows, colWidths=[22 * mm, 88 * mm, 16 * mm, 16 * mm, 16 * mm, 22 * mm],
+                  repeatRows=1)
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ]))
+
+    block = [Paragraph(escape(f"{term_name} {year}"), styles["Heading4"]), table]
+    if term is not None:
+        block.append(Paragraph(
+            f"SGPA: {_fmt(term['sgpa'])} &nbsp;&nbsp; CGPA: {_fmt(term['cgpa'])}",
+            styles["BodyText"],
+        ))
+    block.append(Spacer(1, 4 * mm))
+    return block
@@ -0,0 +1,139 @@
+"""
+Rows/sec for the /api/v1/result/{student_id} response path, before and after
+the column-projected fast path.
+
+before: ORM entity per row -> dict copy -> FormatedResultSchema validation
+        -> jsonable_encoder -> json
+after:  Row tuple per row -> precompiled mapper -> json
+
+No database is involved; both paths start from the same synthetic rows so
+only the per-row Python work is measured. The two response bodies must be
+byte-identical, or nothing is timed.
+
+Usage: python benchmarks/bench_generate_result.py [rows] [repeats]
+"""
+import os
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse
+from app.models import ResultFinalExam
+from app.schemas.result_final_exam import FormatedResultSchema
+from app.services.ResultService import RESULT_COLUMNS, ResultService
+
+
+def synthetic_rows(count):
+    keys = [column.key for column in RESULT_COLUMNS]
+    Row = namedtuple("Row", keys)
+    points = (4.0, 3.75, 3.5, 2.25, 0.0, None)
+    rows = []
+    for i in range(count):
+        rows.append(Row(
+            student_id="222-115-001",
+            offered_module_id=10_000 + i,
+            module_code=f"CSE-{100 + i % 60}",
+            mod_name="Data Structures and Algorithms" if i % 7 else "Bāṃlā Sāhitya",
+            mod_group="Core",
+            per_name="Student Name",
+            letter_grade="A-",
+            grade_point=points[i % len(points)],
+            exm_exam_term=1 + i % 3,
+            exm_exam_year=2019 + i // 30,
+            exm_type=1 + (i % 10 == 0),
+            batch_name=40 + i % 15,
+            section_name="A",
+            tra_term=1 + i % 3,
+            tra_year=2019 + i // 30,
+            reg_status="R",
+            emr_date=datetime(2023, 1, 1, 10, 0),
+            check_grade_point=points[i % len(points)],
+            mod_credit_hour=(3.0, 1.5, 4, None)[i % 4],
+            real_gradepoint=points[(i + 1) % len(points)],
+            faculty_id=17,
+            mod_type="Theory",
+        ))
+    return rows
+
+
+def legacy_prepare(service, results):
+    """prepare_result as it was before the fast path"""
+    results_list = []
+    for val in results:
+        results_list.append({
+            "offered_module_id": val.offered_module_id,
+            "module_code": val.module_code,
+            "mod_name": val.mod_name,
+            "mod_group": val.mod_group,
+            "per_name": val.per_name,
+            "letter_grade": val.letter_grade,
+            "grade_point": float(val.grade_point) if val.grade_point is not None else None,
+            "exm_exam_term": service.determine_term(val.exm_exam_term),
+            "exm_exam_year": val.exm_exam_year,
+            "exm_type": service.determine_exam_type(val.exm_type),
+            "batch_name": str(val.batch_name) + service.get_batch_name_suffix(val.batch_name),
+            "section_name": val.section_name,
+            "tra_term": service.determine_term(val.tra_term),
+            "tra_year": val.tra_year,
+            "reg_status": val.reg_status,
+            "emr_date": val.emr_date,
+            "check_grade_point": float(val.check_grade_point) if val.check_grade_point is not None else None,
+            "mod_credit_hour": float(val.mod_credit_hour) if val.mod_credit_hour is not None else None,
+            "real_gradepoint": float(val.real_gradepoint) if val.real_gradepoint is not None else None,
+            "faculty_id": val.faculty_id,
+            "mod_type": val.mod_type,
+        })
+    return results_list
+
+
+def run_before(service, rows, adapter):
+    entities = [ResultFinalExam(**row._asdict()) for row in rows]
+    validated = adapter.validate_python(legacy_prepare(service, entities))
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def run_after(service, rows, adapter):
+    return FastJSONResponse(service.prepare_result(rows)).body
+
+
+def measure(fn, service, rows, adapter, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(service, rows, adapter)
+        best = min(best, time.perf_counter() - start)
+    return len(rows) / best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    service = ResultService(db=None)
+    adapter = TypeAdapter(List[FormatedResultSchema])
+    rows = synthetic_rows(count)
+
+    expected = run_before(service, rows, adapter)
+    actual = run_after(service, rows, adapter)
+    if expected != actual:
+        sys.exit(f"response bodies differ:\nbefore: {expected[:400]!r}\nafter:  {actual[:400]!r}")
+
+    before = measure(run_before, service, rows, adapter, repeats)
+    after = measure(run_after, service, rows, adapter, repeats)
+
+    print(f"rows: {count}, best of {repeats}, bodies identical ({len(actual):,} bytes)")
+    print(f"before (ORM + validation): {before:12,.0f} rows/sec")
+    print(f"after  (Row + mapper):     {after:12,.0f} rows/sec")
+    print(f"speedup: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()